@@ -0,0 +1,159 @@
+"""
+Compare WSGI and ASGI throughput of the read endpoints with slow clients.
+
+Requests are fed straight into Django's WSGI and ASGI handlers, so no
+server is needed. Every client takes a while to receive its response.
+A WSGI server's thread is blocked for that time, while under ASGI the
+event loop serves other requests in the meantime.
+
+Usage: python -m benchmarks.asgi_vs_wsgi [requests] [clients] [client delay (ms)]
+"""
+import sys
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from io import BytesIO
+
+from benchmarks.common import setup, test_database
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.asgi import get_asgi_application  # noqa: E402
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from shop.models import Item, ItemReview  # noqa: E402
+
+# Threads of the WSGI server, e.g. gunicorn --threads.
+WSGI_THREADS = 8
+
+
+def seed():
+    seller = get_user_model().objects.create(username="benchmark_seller")
+    reviewers = get_user_model().objects.bulk_create(
+        get_user_model()(username=f"benchmark_reviewer{i}") for i in range(5)
+    )
+
+    items = Item.objects.bulk_create(
+        Item(
+            name=f"Item {i}",
+            description="Benchmark item.",
+            price=Decimal("9.99"),
+            seller=seller,
+        )
+        for i in range(100)
+    )
+    ItemReview.objects.bulk_create(
+        ItemReview(item=item, author=reviewer, rate=i + 1, text="Benchmark review.")
+        for item in items
+        for i, reviewer in enumerate(reviewers)
+    )
+
+    return [
+        reverse("shop:list_items"),
+        reverse("shop:retrieve_item", kwargs={"pk": items[0].pk}),
+        reverse("shop:list_reviews", kwargs={"pk": items[0].pk}),
+    ]
+
+
+def run_wsgi(application, paths, client_delay):
+    def request(path):
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": BytesIO(),
+            "wsgi.errors": sys.stderr,
+        }
+        status = []
+        body = b"".join(application(environ, lambda s, headers: status.append(s)))
+        # The thread writes the response to the slow client.
+        time.sleep(client_delay)
+
+        return status[0], body
+
+    with ThreadPoolExecutor(WSGI_THREADS) as executor:
+        return list(executor.map(request, paths))
+
+
+def run_asgi(application, paths, clients, client_delay):
+    async def request(path, semaphore):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "query_string": b"",
+            "headers": [(b"host", b"testserver")],
+            "server": ("testserver", 80),
+        }
+        messages = []
+        body_sent = False
+        disconnected = asyncio.Event()
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] == "http.response.body":
+                # The event loop serves others while the client reads.
+                await asyncio.sleep(client_delay)
+
+        async with semaphore:
+            await application(scope, receive, send)
+            disconnected.set()
+
+        return messages[0]["status"], b"".join(m.get("body", b"") for m in messages)
+
+    async def main():
+        semaphore = asyncio.Semaphore(clients)
+        return await asyncio.gather(*(request(path, semaphore) for path in paths))
+
+    return asyncio.run(main())
+
+
+def report(label, run, count):
+    start = time.perf_counter()
+    responses = run()
+    elapsed = time.perf_counter() - start
+
+    errors = sum(1 for status, body in responses if not str(status).startswith("200"))
+    print(f"{label}: {count / elapsed:.1f} requests/s ({errors} errors)")
+
+
+def main(count, clients, client_delay):
+    with test_database():
+        paths = seed()
+        paths = [paths[i % len(paths)] for i in range(count)]
+
+        wsgi = get_wsgi_application()
+        asgi = get_asgi_application()
+
+        print(f"{count} requests, {clients} clients, {client_delay * 1000:.0f} ms per client")
+
+        report(
+            f"WSGI ({WSGI_THREADS} threads)",
+            lambda: run_wsgi(wsgi, paths, client_delay),
+            count
+        )
+        report("ASGI", lambda: run_asgi(asgi, paths, clients, client_delay), count)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+        (int(sys.argv[3]) if len(sys.argv) > 3 else 50) / 1000,
+    )
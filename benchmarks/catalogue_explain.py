@@ -0,0 +1,84 @@
+"""
+Show that catalogue filters and orderings are served by indexes.
+
+Seeds a test database with items, then prints the query plan
+and the average time of the first page for each filter.
+
+Usage: python -m benchmarks.catalogue_explain [item count]
+"""
+import sys
+import random
+from decimal import Decimal
+
+from benchmarks.common import setup, test_database, timer
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from shop.models import Item  # noqa: E402
+
+PAGE_SIZE = 10
+REPEAT = 50
+
+QUERIES = {
+    "newest": lambda qs, sellers: qs.order_by("-created_at", "-id"),
+    "available, newest": lambda qs, sellers: qs.filter(available=True).order_by(
+        "-created_at", "-id"
+    ),
+    "available, under $50, cheapest": lambda qs, sellers: qs.filter(
+        available=True, price__lte=Decimal("50")
+    ).order_by("price", "id"),
+    "price range, most expensive": lambda qs, sellers: qs.filter(
+        price__gte=Decimal("100"), price__lte=Decimal("200")
+    ).order_by("-price", "-id"),
+    "seller, newest": lambda qs, sellers: qs.filter(seller=sellers[0]).order_by(
+        "-created_at", "-id"
+    ),
+    "best rated": lambda qs, sellers: qs.order_by("-rating_avg", "-id"),
+}
+
+
+def seed(item_count):
+    sellers = [
+        get_user_model().objects.create(username=f"benchmark_seller{i}")
+        for i in range(100)
+    ]
+
+    items = (
+        Item(
+            name=f"Item {i}",
+            description="Benchmark item.",
+            price=Decimal(random.randint(100, 100000)) / 100,
+            stock=None if random.random() < 0.8 else 0,
+            seller=random.choice(sellers),
+            rating_avg=random.random() * 10,
+        )
+        for i in range(item_count)
+    )
+    Item.objects.bulk_create(items, batch_size=5000)
+
+    return sellers
+
+
+def main(item_count):
+    with test_database() as connection:
+        sellers = seed(item_count)
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        for label, build in QUERIES.items():
+            queryset = build(Item.objects.all(), sellers)[:PAGE_SIZE]
+
+            print(f"== {label}")
+            print(queryset.explain())
+
+            with timer("first page", REPEAT):
+                for _ in range(REPEAT):
+                    list(queryset.all())
+
+            print()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
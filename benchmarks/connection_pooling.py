@@ -0,0 +1,92 @@
+"""
+Compare request latency with and without database connection reuse.
+
+Runs the same requests once per connection setting, each in its own
+process, since Django reads the settings when it starts:
+
+  - new connection: DB_POOL=false, DB_CONN_MAX_AGE=0
+  - persistent:     DB_POOL=false, DB_CONN_MAX_AGE=60
+  - pool:           DB_POOL=true
+
+Requires PostgreSQL. The review list is used because it isn't cached,
+so every request needs a connection.
+
+Usage: python -m benchmarks.connection_pooling [requests]
+"""
+import os
+import sys
+import subprocess
+import statistics
+import time
+from io import BytesIO
+
+MODES = {
+    "new connection": {"DB_POOL": "false", "DB_CONN_MAX_AGE": "0"},
+    "persistent": {"DB_POOL": "false", "DB_CONN_MAX_AGE": "60"},
+    "pool": {"DB_POOL": "true"},
+}
+
+
+def measure(count):
+    from benchmarks.common import setup, test_database
+
+    setup()
+
+    from django.contrib.auth import get_user_model
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import reverse
+    from shop.models import Item
+
+    with test_database():
+        seller = get_user_model().objects.create(username="benchmark_seller")
+        item = Item.objects.create(name="Item", price=1, seller=seller)
+        path = reverse("shop:list_reviews", kwargs={"pk": item.pk})
+
+        application = get_wsgi_application()
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "wsgi.url_scheme": "http",
+            "wsgi.errors": sys.stderr,
+        }
+
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            # Closing the response ends the request, which releases
+            # or closes the connection as configured.
+            response = application(
+                {**environ, "wsgi.input": BytesIO()},
+                lambda status, headers: None
+            )
+            b"".join(response)
+            response.close()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    print(
+        f"mean {statistics.mean(latencies):.2f} ms, "
+        f"p50 {latencies[len(latencies) // 2]:.2f} ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95)]:.2f} ms"
+    )
+
+
+def main(count):
+    for label, env in MODES.items():
+        print(f"{label}: ", end="", flush=True)
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.connection_pooling", str(count), "--measure"],
+            env={**os.environ, **env},
+            check=True
+        )
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    if "--measure" in sys.argv:
+        measure(count)
+    else:
+        main(count)
@@ -0,0 +1,91 @@
+"""
+Compare DRF's JSON renderer and parser with the orjson based ones
+(config.renderers, config.parsers) on ItemSerializer output.
+
+The payload is a list of items with photos, sellers and recent
+reviews, like a large catalogue page.
+
+Usage: python -m benchmarks.json_rendering [items] [iterations]
+"""
+import sys
+from decimal import Decimal
+from io import BytesIO
+
+from benchmarks.common import setup, test_database, timer
+
+setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+
+from config.parsers import FastJSONParser  # noqa: E402
+from config.renderers import FastJSONRenderer, orjson  # noqa: E402
+from shop.models import Item, ItemPhoto, ItemReview  # noqa: E402
+from shop.serializers import ItemSerializer  # noqa: E402
+
+
+def seed(count):
+    seller = get_user_model().objects.create(username="benchmark_seller")
+    reviewers = get_user_model().objects.bulk_create(
+        get_user_model()(username=f"benchmark_reviewer{i}") for i in range(5)
+    )
+
+    items = Item.objects.bulk_create(
+        Item(
+            name=f"Item {i}",
+            description="Benchmark item with a description of realistic length. " * 4,
+            price=Decimal("9.99") + i,
+            seller=seller,
+        )
+        for i in range(count)
+    )
+    ItemPhoto.objects.bulk_create(
+        ItemPhoto(item=item, photo=f"item_photos/item_{item.pk}_{i}.jpg")
+        for item in items
+        for i in range(3)
+    )
+    ItemReview.objects.bulk_create(
+        ItemReview(item=item, author=reviewer, rate=i + 1, text="Benchmark review.")
+        for item in items
+        for i, reviewer in enumerate(reviewers)
+    )
+
+    request = Request(RequestFactory().get("/shop/"))
+
+    return ItemSerializer(
+        Item.objects.with_details().order_by("-created_at", "-id"),
+        many=True,
+        context={"request": request}
+    ).data
+
+
+def main(count, iterations):
+    with test_database():
+        data = seed(count)
+
+    if orjson is None:
+        print("orjson isn't installed, the fast renderer and parser use the json module")
+
+    body = JSONRenderer().render(data)
+    print(f"{count} items, {len(body) / 1024:.0f} KiB")
+
+    renderers = (("JSONRenderer", JSONRenderer()), ("FastJSONRenderer", FastJSONRenderer()))
+    for label, renderer in renderers:
+        with timer(f"render, {label}", iterations):
+            for _ in range(iterations):
+                renderer.render(data)
+
+    for label, parser in (("JSONParser", JSONParser()), ("FastJSONParser", FastJSONParser())):
+        with timer(f"parse, {label}", iterations):
+            for _ in range(iterations):
+                parser.parse(BytesIO(body), parser_context={})
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
@@ -0,0 +1,149 @@
+"""
+Reserve one hot item from many threads at once, like a flash sale,
+and check that it isn't oversold.
+
+Compares three ways of taking stock:
+
+  - conditional update: shop.inventory.take_stock(), "UPDATE ... SET
+    stock = stock - n WHERE stock >= n"
+  - locked read-modify-write: SELECT ... FOR UPDATE, then save
+  - read-modify-write: no lock, which oversells
+
+Every thread reserves one item at a time until it's sold out. Each
+reservation is a transaction that takes the stock and creates the
+reservation, the release job queued by the API isn't included.
+Meant for PostgreSQL, on SQLite the test database must be a file
+(TEST NAME in the database settings), and writers take turns anyway.
+
+Usage: python -m benchmarks.stock_contention [threads] [stock]
+"""
+import sys
+import statistics
+import threading
+import time
+from datetime import timedelta
+
+from benchmarks.common import setup, test_database
+
+setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction, DatabaseError  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from shop import inventory  # noqa: E402
+from shop.exceptions import Conflict  # noqa: E402
+from shop.models import Item, StockReservation  # noqa: E402
+
+
+def expires_at():
+    return timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+
+
+def reserve_conditional(item_id, user):
+    with transaction.atomic():
+        inventory.take_stock(item_id, 1)
+        StockReservation.objects.create(
+            item_id=item_id, user=user, quantity=1, expires_at=expires_at()
+        )
+
+
+def reserve_locked(item_id, user):
+    with transaction.atomic():
+        item = Item.objects.select_for_update().only("stock").get(pk=item_id)
+        if item.stock < 1:
+            raise Conflict()
+
+        item.stock -= 1
+        item.save(update_fields=["stock"])
+        StockReservation.objects.create(
+            item_id=item_id, user=user, quantity=1, expires_at=expires_at()
+        )
+
+
+def reserve_unlocked(item_id, user):
+    item = Item.objects.only("stock").get(pk=item_id)
+    if item.stock < 1:
+        raise Conflict()
+
+    item.stock -= 1
+    item.save(update_fields=["stock"])
+    StockReservation.objects.create(
+        item_id=item_id, user=user, quantity=1, expires_at=expires_at()
+    )
+
+
+STRATEGIES = {
+    "conditional update": reserve_conditional,
+    "locked read-modify-write": reserve_locked,
+    "read-modify-write": reserve_unlocked,
+}
+
+
+def run(reserve, item_id, users):
+    barrier = threading.Barrier(len(users))
+    latencies = []
+    errors = []
+
+    def buy(user):
+        barrier.wait()
+
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    reserve(item_id, user)
+                except Conflict:
+                    break
+                except DatabaseError as exc:
+                    errors.append(exc)
+                    continue
+
+                latencies.append(time.perf_counter() - start)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=buy, args=(user,)) for user in users]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return latencies, errors, elapsed
+
+
+def main(thread_count, stock):
+    with test_database():
+        seller = get_user_model().objects.create(username="benchmark_seller")
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(username=f"benchmark_buyer{i}") for i in range(thread_count)
+        )
+
+        print(f"{thread_count} threads, {stock} items in stock")
+
+        for label, reserve in STRATEGIES.items():
+            item = Item.objects.create(name=label, price=1, stock=stock, seller=seller)
+
+            latencies, errors, elapsed = run(reserve, item.pk, users)
+
+            item.refresh_from_db()
+            reserved = StockReservation.objects.filter(item=item).count()
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+
+            print(
+                f"{label}: {reserved} reserved, {max(reserved - stock, 0)} oversold, "
+                f"final stock {item.stock}, {len(errors)} errors, "
+                f"{len(latencies) / elapsed:.0f} reservations/s, "
+                f"p50 {quantiles[49] * 1000:.2f} ms, p99 {quantiles[98] * 1000:.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 32,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+    )
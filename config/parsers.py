@@ -0,0 +1,37 @@
+"""
+JSON parsing with orjson, see config.renderers.
+
+orjson is optional, without it the parser is DRF's JSONParser.
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser that uses orjson if it's installed.
+    Like the strict JSONParser, it rejects NaN and Infinity.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        try:
+            data = stream.read()
+            # orjson reads UTF-8 only.
+            if codecs.lookup(encoding).name != "utf-8":
+                data = data.decode(encoding)
+
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
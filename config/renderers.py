@@ -0,0 +1,49 @@
+"""
+JSON rendering with orjson, which is several times faster than
+the json module for large payloads such as item lists.
+
+orjson is optional, without it the renderer is DRF's JSONRenderer.
+"""
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Types orjson doesn't know, like Decimal and lazy translations,
+# are encoded the way DRF's encoder does it.
+_encoder = encoders.JSONEncoder()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that uses orjson if it's installed.
+
+    orjson only writes compact UTF-8, so indented output (e.g. for
+    the browsable API) is left to the json module. Datetimes are
+    written by orjson with full precision, and NaN as null.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data,
+            default=_encoder.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+
+        # Escaped like JSONRenderer does, to keep the output
+        # a strict JavaScript subset.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+        return ret
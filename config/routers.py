@@ -0,0 +1,168 @@
+"""
+Routing of queries between the primary database and read replicas.
+
+Reads go to a random replica from DATABASE_REPLICAS, but only within
+requests that haven't written anything. Requests with unsafe methods,
+and requests from clients that wrote in the last DATABASE_REPLICA_LAG
+seconds, use the primary only. Queries outside of requests (management
+commands, job workers) always use the primary.
+
+Clients that wrote are recognized by the user id of their JWT, kept in
+the cache, which holds for every client of the user and every server.
+Clients without a token get a cookie instead.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.decorators import sync_and_async_middleware
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+# Set by ReplicaMiddleware to the state of the current request.
+_request_state = ContextVar("request_state", default=None)
+
+# Marks clients that recently wrote to the primary.
+STICKY_COOKIE = "use_primary"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class RequestState:
+    def __init__(self, use_primary, user_id=None):
+        self.use_primary = use_primary
+        self.user_id = user_id
+        self.wrote = False
+
+
+def sticky_key(user_id):
+    return f"routers:primary:{user_id}"
+
+
+def get_user_id(request):
+    """
+    Return the user id of the request's JWT, or None if it has
+    no valid token. The user isn't looked up in the database.
+    """
+    authentication = JWTAuthentication()
+
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+
+    try:
+        raw_token = authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def pin_primary():
+    """
+    Send the remaining queries of the current request to the primary.
+    """
+    state = _request_state.get()
+    if state is not None:
+        state.use_primary = True
+
+
+class ReplicaRouter:
+    """
+    Database router that sends reads to replicas
+    where that can't return stale data.
+    """
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or state.use_primary or not settings.DATABASE_REPLICAS:
+            return "default"
+
+        # Related objects are read from the database of their instance.
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.use_primary = state.wrote = True
+
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+def _start_request(request):
+    user_id = get_user_id(request) if settings.DATABASE_REPLICAS else None
+    state = RequestState(
+        use_primary=request.method not in SAFE_METHODS or STICKY_COOKIE in request.COOKIES,
+        user_id=user_id
+    )
+
+    return state, _request_state.set(state)
+
+
+def _finish_request(response, state, token):
+    _request_state.reset(token)
+
+    if state.wrote:
+        response.set_cookie(
+            STICKY_COOKIE,
+            "1",
+            max_age=settings.DATABASE_REPLICA_LAG,
+            httponly=True,
+            samesite="Lax"
+        )
+
+    return response
+
+
+@sync_and_async_middleware
+def replica_middleware(get_response):
+    """
+    Track which database the queries of each request may use.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            state, token = _start_request(request)
+            key = state.user_id is not None and sticky_key(state.user_id)
+
+            if key and not state.use_primary:
+                state.use_primary = await cache.aget(key, False)
+
+            response = _finish_request(await get_response(request), state, token)
+
+            if key and state.wrote:
+                await cache.aset(key, True, settings.DATABASE_REPLICA_LAG)
+
+            return response
+    else:
+        def middleware(request):
+            state, token = _start_request(request)
+            key = state.user_id is not None and sticky_key(state.user_id)
+
+            if key and not state.use_primary:
+                state.use_primary = cache.get(key, False)
+
+            response = _finish_request(get_response(request), state, token)
+
+            if key and state.wrote:
+                cache.set(key, True, settings.DATABASE_REPLICA_LAG)
+
+            return response
+
+    return middleware
@@ -9,6 +9,7 @@ https://docs.djangoproject.com/en/6.0/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
+import copy
 import os
 
 from pathlib import Path
@@ -44,15 +45,18 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_countries",
     "rest_framework",
     "rest_framework_simplejwt",
     "users",
     "shop",
+    "jobs",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "config.routers.replica_middleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -104,6 +108,90 @@ DATABASES = {
     }
 }
 
+# Connection reuse (PostgreSQL only).
+# By default connections come from a psycopg pool shared by the threads
+# of a process. With DB_POOL=false, each thread keeps a persistent
+# connection for DB_CONN_MAX_AGE seconds instead (0 closes it after
+# every request).
+if (os.getenv("DB_POOL") or "true").lower() in ("true", "1"):
+    from psycopg_pool import ConnectionPool
+
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE") or 2),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE") or 10),
+            # Seconds to wait for a free connection.
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT") or 10),
+            # Connections are replaced after this many seconds.
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME") or 3600),
+            # Connections are checked before they are handed out.
+            "check": ConnectionPool.check_connection,
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE") or 0)
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Read replicas
+# Comma separated hosts of replicas of the default database. Safe requests
+# read from them, see config/routers.py. Reads of a client that wrote, and
+# cache fills after any change, use the primary for DB_REPLICA_LAG seconds.
+DATABASE_REPLICAS = []
+
+for number, host in enumerate(filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")), 1):
+    alias = f"replica{number}"
+    DATABASES[alias] = copy.deepcopy(DATABASES["default"])
+    DATABASES[alias]["HOST"] = host.strip()
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_REPLICA_LAG = int(os.getenv("DB_REPLICA_LAG") or 5)
+
+DATABASE_ROUTERS = ["config.routers.ReplicaRouter"]
+
+
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+# Cached responses, their validators and the versions that invalidate them
+# must be shared by all processes, so Redis is used when CACHE_LOCATION is set.
+# The local memory cache only suits a single process (development and tests),
+# "manage.py check --deploy" reports it.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND")
+        or (
+            "django.core.cache.backends.redis.RedisCache"
+            if os.getenv("CACHE_LOCATION")
+            else "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT") or 300),
+    }
+}
+
+# Public URL of the API, e.g. "https://api.example.com".
+# When set, a background job refills the catalogue cache after changes.
+CACHE_WARMUP_URL = os.getenv("CACHE_WARMUP_URL")
+
+
+# Background jobs
+# Queued in the database and run by "manage.py runworker".
+
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY") or 2)
+
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL") or 1)
+
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS") or 5)
+
+# Seconds before the first retry, doubled after every failed attempt.
+JOBS_RETRY_DELAY = int(os.getenv("JOBS_RETRY_DELAY") or 10)
+
+JOBS_RETRY_DELAY_MAX = int(os.getenv("JOBS_RETRY_DELAY_MAX") or 3600)
+
+# Seconds a job may run before other workers consider it abandoned.
+JOBS_LEASE = int(os.getenv("JOBS_LEASE") or 600)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -131,7 +219,17 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+    ),
+    # orjson based, if it's installed.
+    'DEFAULT_RENDERER_CLASSES': (
+        'config.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'config.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 
@@ -154,6 +252,25 @@ MEDIA_URL = "media/"
 
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Photos are written to storage by a bounded thread pool.
+PHOTO_UPLOAD_WORKERS = int(os.getenv("PHOTO_UPLOAD_WORKERS") or 4)
+
+PHOTO_UPLOAD_MAX_FILES = int(os.getenv("PHOTO_UPLOAD_MAX_FILES") or 50)
+
+# Operations accepted by one batch update of a cart.
+CART_MAX_OPERATIONS = int(os.getenv("CART_MAX_OPERATIONS") or 200)
+
+# Resized variants of item photos and profile pictures
+# are generated by background jobs.
+IMAGE_VARIANTS = {"thumb": 320, "medium": 800, "large": 1600}
+
+IMAGE_VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT") or "WEBP"
+
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY") or 80)
+
+# Seconds reserved items are held for a user before going back to stock.
+STOCK_RESERVATION_TTL = int(os.getenv("STOCK_RESERVATION_TTL") or 900)
+
 STATIC_URL = "static/"
 
 STATIC_ROOT = BASE_DIR / "staticfiles"
@@ -0,0 +1,35 @@
+from io import BytesIO
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+
+from config import parsers
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def parse(self, body, encoding="utf-8"):
+        return parsers.FastJSONParser().parse(
+            BytesIO(body), parser_context={"encoding": encoding}
+        )
+
+    def test_parse(self):
+        self.assertEqual(
+            self.parse('{"rate": 7, "text": "Café"}'.encode()),
+            {"rate": 7, "text": "Café"}
+        )
+
+    def test_parse_other_encoding(self):
+        self.assertEqual(
+            self.parse('{"text": "Café"}'.encode("latin-1"), "latin-1"),
+            {"text": "Café"}
+        )
+
+    def test_parse_invalid(self):
+        for body in (b'{"rate": ', b'{"rate": NaN}', b'{"text": "\xff"}'):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                self.parse(body)
+
+    def test_parse_without_orjson(self):
+        with mock.patch.object(parsers, "orjson", None):
+            self.assertEqual(self.parse(b'{"rate": 7}'), {"rate": 7})
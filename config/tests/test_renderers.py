@@ -0,0 +1,43 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from config import renderers
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    data = {
+        "price": Decimal("5.70"),
+        "created_at": datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "name": "Café\u2028item",
+        "photos": [{"id": 1, "photo": None}],
+        1: True,
+    }
+
+    def test_render(self):
+        rendered = renderers.FastJSONRenderer().render(self.data)
+        expected = JSONRenderer().render(self.data)
+
+        self.assertEqual(json.loads(rendered), json.loads(expected))
+        self.assertNotIn(b"\xe2\x80\xa8", rendered)
+        self.assertIn("Café".encode(), rendered)
+
+    def test_render_indent(self):
+        rendered = renderers.FastJSONRenderer().render(
+            self.data, "application/json; indent=4"
+        )
+
+        self.assertEqual(rendered, JSONRenderer().render(self.data, "application/json; indent=4"))
+
+    def test_render_none(self):
+        self.assertEqual(renderers.FastJSONRenderer().render(None), b"")
+
+    def test_render_without_orjson(self):
+        with mock.patch.object(renderers, "orjson", None):
+            rendered = renderers.FastJSONRenderer().render(self.data)
+
+        self.assertEqual(rendered, JSONRenderer().render(self.data))
@@ -0,0 +1,220 @@
+import os
+import tempfile
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (SimpleTestCase, RequestFactory, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config import routers
+from shop.models import Item
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], DATABASE_REPLICA_LAG=5)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def route(self, request, write=False):
+        """
+        Pass the request through the middleware and return the
+        databases the view would read from, and the response.
+        """
+        databases = []
+
+        def view(request):
+            databases.append(self.router.db_for_read(Item))
+            if write:
+                databases.append(self.router.db_for_write(Item))
+                databases.append(self.router.db_for_read(Item))
+
+            return HttpResponse()
+
+        return databases, routers.replica_middleware(view)(request)
+
+    def test_safe_request(self):
+        databases, response = self.route(self.factory.get("/"))
+
+        self.assertEqual(databases, ["replica"])
+        self.assertNotIn(routers.STICKY_COOKIE, response.cookies)
+
+    def test_read_after_write(self):
+        databases, response = self.route(self.factory.get("/"), write=True)
+
+        self.assertEqual(databases, ["replica", "default", "default"])
+        self.assertEqual(response.cookies[routers.STICKY_COOKIE]["max-age"], 5)
+
+    def test_unsafe_request(self):
+        databases, response = self.route(self.factory.post("/"), write=True)
+
+        self.assertEqual(databases, ["default", "default", "default"])
+        self.assertIn(routers.STICKY_COOKIE, response.cookies)
+
+    def test_sticky_client(self):
+        request = self.factory.get("/")
+        request.COOKIES[routers.STICKY_COOKIE] = "1"
+
+        databases, response = self.route(request)
+
+        self.assertEqual(databases, ["default"])
+
+    def test_sticky_user(self):
+        user = get_user_model()(pk=1, username="test_user")
+        authorization = f"Bearer {AccessToken.for_user(user)}"
+
+        cache.delete(routers.sticky_key(user.pk))
+
+        databases, response = self.route(
+            self.factory.post("/", HTTP_AUTHORIZATION=authorization), write=True
+        )
+
+        self.assertTrue(cache.get(routers.sticky_key(user.pk)))
+
+        # Another client of the user, without the cookie.
+        databases, response = self.route(
+            self.factory.get("/", HTTP_AUTHORIZATION=authorization)
+        )
+
+        self.assertEqual(databases, ["default"])
+
+        databases, response = self.route(
+            self.factory.get("/", HTTP_AUTHORIZATION="Bearer invalid")
+        )
+
+        self.assertEqual(databases, ["replica"])
+
+        cache.delete(routers.sticky_key(user.pk))
+
+    def test_pin_primary(self):
+        def view(request):
+            routers.pin_primary()
+            return HttpResponse(self.router.db_for_read(Item))
+
+        response = routers.replica_middleware(view)(self.factory.get("/"))
+
+        self.assertEqual(response.content, b"default")
+
+    def test_outside_request(self):
+        self.assertEqual(self.router.db_for_read(Item), "default")
+        self.assertTrue(self.router.allow_migrate("default", "shop"))
+        self.assertFalse(self.router.allow_migrate("replica", "shop"))
+
+    async def test_async_request(self):
+        async def view(request):
+            return HttpResponse(self.router.db_for_read(Item))
+
+        response = await routers.replica_middleware(view)(self.factory.get("/"))
+
+        self.assertEqual(response.content, b"replica")
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], DATABASE_REPLICA_LAG=5)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Requests routed between the default database and a replica,
+    a separate SQLite database with the same schema. Rows are
+    named differently in each, to tell where they were read from.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # Added after the test runner set up the test databases,
+        # this one isn't a copy of the primary.
+        cls.directory = tempfile.TemporaryDirectory()
+
+        connections.settings["replica"] = connections.configure_settings({
+            "default": connections["default"].settings_dict,
+            "replica": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": os.path.join(cls.directory.name, "replica.sqlite3"),
+            },
+        })["replica"]
+        cls.databases = {*cls.databases, "replica"}
+
+        # The router only allows migrations on the primary.
+        with override_settings(DATABASE_ROUTERS=[]):
+            call_command("migrate", database="replica", verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.users = [
+            get_user_model().objects.create_user(
+                username=f"test_user{i}",
+                password="dws9uirj"
+            )
+            for i in range(2)
+        ]
+
+        self.item = Item.objects.create(
+            name="Primary Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=self.users[0],
+        )
+
+        get_user_model().objects.using("replica").bulk_create(self.users)
+        Item.objects.using("replica").bulk_create([
+            Item(
+                pk=self.item.pk,
+                name="Replica Item",
+                description=self.item.description,
+                price=self.item.price,
+                seller=self.users[0],
+            )
+        ])
+
+        cache.clear()
+
+    def tearDown(self):
+        Item.objects.using("replica").all().delete()
+        get_user_model().objects.using("replica").all().delete()
+
+    def get_client(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+        return client
+
+    def get_name(self, client):
+        response = client.get(reverse("shop:retrieve_item", kwargs={"pk": self.item.pk}))
+
+        return response.json()["name"]
+
+    def test_read_your_writes(self):
+        seller = self.get_client(self.users[0])
+
+        self.assertEqual(self.get_name(seller), "Replica Item")
+
+        response = seller.patch(
+            reverse("shop:retrieve_item", kwargs={"pk": self.item.pk}),
+            data={"name": "Updated Item"},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+        # The token, not the cookie, keeps the seller on the primary.
+        seller.cookies.clear()
+
+        self.assertEqual(self.get_name(seller), "Updated Item")
+        self.assertEqual(self.get_name(self.get_client(self.users[1])), "Replica Item")
+
+        cache.delete(routers.sticky_key(self.users[0].pk))
+
+        self.assertEqual(self.get_name(seller), "Replica Item")
@@ -0,0 +1,29 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from . import models
+
+
+@admin.action(description="Retry selected failed jobs")
+def retry_jobs(modeladmin, request, queryset):
+    # Jobs whose work is already queued again are skipped.
+    queued_keys = models.Job.objects.filter(
+        status=models.Job.Status.QUEUED, key__isnull=False
+    ).values("key")
+
+    queryset.filter(status=models.Job.Status.FAILED).exclude(
+        key__in=queued_keys
+    ).update(
+        status=models.Job.Status.QUEUED,
+        attempts=0,
+        run_after=timezone.now()
+    )
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["name", "status", "attempts", "run_after", "created_at"]
+    list_filter = ["status", "name"]
+    actions = [retry_jobs]
+
+
+admin.site.register(models.Job, JobAdmin)
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from functools import update_wrapper
+
+from django.utils import timezone
+
+from .models import Job
+
+
+class JobFunction:
+    """
+    A function that can be queued and run by a worker.
+    Calling it runs the function right away.
+    """
+    def __init__(self, func, max_attempts=None, key=None, delay=0):
+        update_wrapper(self, func)
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.max_attempts = max_attempts
+        self.key = key
+        self.delay = delay
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, **kwargs):
+        """
+        Queue a call with the given arguments, which must be
+        JSON serializable. The job is written in the current
+        transaction, so workers only see it once it commits.
+        """
+        return self.enqueue_at(
+            timezone.now() + timedelta(seconds=self.delay), *args, **kwargs
+        )
+
+    def enqueue_at(self, run_after, *args, **kwargs):
+        """
+        Like enqueue(), but the job doesn't run before
+        run_after instead of after the delay.
+        """
+        return Job.objects.enqueue(
+            self.name,
+            args,
+            kwargs,
+            key=self.key(*args, **kwargs) if self.key else None,
+            run_after=run_after,
+            max_attempts=self.max_attempts
+        )
+
+
+def job(func=None, *, max_attempts=None, key=None, delay=0):
+    """
+    Make a module level function queueable.
+
+    max_attempts overrides JOBS_MAX_ATTEMPTS.
+    key is called with the job arguments and returns its idempotency
+    key. A job isn't queued twice while one with the same key waits.
+    delay is the number of seconds to wait before running the job.
+    """
+    def decorator(func):
+        return JobFunction(func, max_attempts=max_attempts, key=key, delay=delay)
+
+    if func is None:
+        return decorator
+
+    return decorator(func)
@@ -0,0 +1,79 @@
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs import worker, processes
+
+
+class Command(BaseCommand):
+    help = "Run queued jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.JOBS_CONCURRENCY,
+            help="Number of jobs run at the same time."
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Run jobs in processes instead of threads."
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.JOBS_POLL_INTERVAL,
+            help="Seconds to wait when there are no due jobs."
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once there are no due jobs."
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options["concurrency"]
+        work_args = (options["poll_interval"], options["burst"])
+
+        if concurrency == 1:
+            stop = threading.Event()
+            self.stop_on_sigterm(stop)
+            try:
+                worker.work(stop, *work_args)
+            except KeyboardInterrupt:
+                pass
+            return
+
+        if options["processes"]:
+            context = multiprocessing.get_context("spawn")
+            stop = context.Event()
+            workers = [
+                context.Process(target=processes.work_in_process, args=(stop, *work_args))
+                for _ in range(concurrency)
+            ]
+        else:
+            stop = threading.Event()
+            workers = [
+                threading.Thread(target=worker.work, args=(stop, *work_args))
+                for _ in range(concurrency)
+            ]
+
+        self.stop_on_sigterm(stop)
+        for w in workers:
+            w.start()
+
+        try:
+            for w in workers:
+                w.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Finishing running jobs...")
+            stop.set()
+            for w in workers:
+                w.join()
+
+    def stop_on_sigterm(self, stop):
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
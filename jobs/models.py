@@ -0,0 +1,168 @@
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction, connections, IntegrityError
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+class JobQuerySet(models.QuerySet):
+    """
+    Custom queryset for jobs.
+    """
+    def enqueue(self, name, args=(), kwargs=None, key=None, run_after=None,
+                max_attempts=None):
+        """
+        Queue a job. If a job with the same key is
+        already queued, that job is returned instead.
+        """
+        job = self.model(
+            name=name,
+            args=list(args),
+            kwargs=kwargs or {},
+            key=key,
+            run_after=run_after or timezone.now(),
+            max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        )
+
+        if key is None:
+            job.save(using=self.db)
+            return job
+
+        try:
+            with transaction.atomic(using=self.db):
+                job.save(using=self.db)
+        except IntegrityError:
+            queued = self.filter(key=key, status=Job.Status.QUEUED).first()
+            if queued is None:
+                raise
+            return queued
+
+        return job
+
+    def claim(self):
+        """
+        Mark the next due job as running and return it.
+        Running jobs whose lease expired, e.g. because their
+        worker died, are due again.
+        """
+        now = timezone.now()
+        due = self.filter(
+            Q(status=Job.Status.QUEUED, run_after__lte=now)
+            | Q(status=Job.Status.RUNNING, locked_until__lt=now)
+        ).order_by("run_after", "pk")
+
+        # Where the database supports it, workers skip rows locked by others.
+        # On SQLite, a read-then-write transaction fails when another worker
+        # writes in between, so only the conditional update below is used.
+        skip_locked = connections[self.db].features.has_select_for_update_skip_locked
+
+        with transaction.atomic(using=self.db) if skip_locked else nullcontext():
+            if skip_locked:
+                due = due.select_for_update(skip_locked=True)
+
+            job = due.first()
+            if job is None:
+                return None
+
+            # Two workers can't claim the same job,
+            # as only one of them can update it.
+            locked_until = now + timedelta(seconds=settings.JOBS_LEASE)
+            claimed = self.filter(
+                pk=job.pk, status=job.status, attempts=job.attempts
+            ).update(
+                status=Job.Status.RUNNING,
+                attempts=F("attempts") + 1,
+                locked_until=locked_until
+            )
+
+        if not claimed:
+            return None
+
+        job.status = Job.Status.RUNNING
+        job.attempts += 1
+        job.locked_until = locked_until
+
+        return job
+
+
+class Job(models.Model):
+    """
+    This model represents a queued call of a function
+    decorated with jobs.base.job.
+    Jobs are deleted once they succeed.
+    """
+    class Status(models.TextChoices):
+        QUEUED = "queued"
+        RUNNING = "running"
+        FAILED = "failed"
+
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    # Only one job with a given key can be queued at a time.
+    key = models.CharField(max_length=255, blank=True, null=True)
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField()
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key"],
+                condition=Q(status="queued"),
+                name="jobs_job_queued_key"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="jobs_job_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+    def run(self):
+        return import_string(self.name).func(*self.args, **self.kwargs)
+
+    def succeed(self):
+        Job.objects.filter(pk=self.pk).delete()
+
+    def fail(self, error):
+        """
+        Queue the job again with an exponential backoff,
+        or mark it as failed after its last attempt.
+        """
+        job = Job.objects.filter(pk=self.pk)
+
+        if self.attempts >= self.max_attempts:
+            job.update(status=Job.Status.FAILED, locked_until=None, last_error=error)
+            return
+
+        delay = min(
+            settings.JOBS_RETRY_DELAY * 2 ** (self.attempts - 1),
+            settings.JOBS_RETRY_DELAY_MAX
+        )
+
+        try:
+            with transaction.atomic():
+                job.update(
+                    status=Job.Status.QUEUED,
+                    run_after=timezone.now() + timedelta(seconds=delay),
+                    locked_until=None,
+                    last_error=error
+                )
+        except IntegrityError:
+            # The same work was queued again in the meantime.
+            job.update(status=Job.Status.FAILED, locked_until=None, last_error=error)
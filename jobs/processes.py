@@ -0,0 +1,18 @@
+import signal
+
+import django
+
+
+def work_in_process(stop, poll_interval, burst=False):
+    """
+    Entry point of worker processes. They are started with
+    the "spawn" method, so Django has to be set up again
+    before any models are imported.
+    """
+    # Interrupts are handled by the parent process.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+
+    from .worker import work
+
+    work(stop, poll_interval, burst)
@@ -0,0 +1,20 @@
+from jobs.base import job
+
+
+calls = []
+
+
+@job(key=lambda value: f"test:{value}")
+def record(value):
+    """
+    This job records its argument in calls.
+    """
+    calls.append(value)
+
+
+@job(max_attempts=2)
+def explode():
+    """
+    This job always fails.
+    """
+    raise ValueError("Test failure.")
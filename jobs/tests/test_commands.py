@@ -0,0 +1,25 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from jobs.models import Job
+from .common import calls, record, explode
+
+
+class RunWorkerTests(TestCase):
+    def test_runworker_burst(self):
+        calls.clear()
+
+        record.enqueue("first")
+        record.enqueue("second")
+        explode.enqueue()
+
+        with self.assertLogs("jobs.worker", "ERROR"):
+            call_command("runworker", "--burst", "--concurrency=1")
+
+        self.assertEqual(calls, ["first", "second"])
+
+        job = Job.objects.get()
+
+        self.assertEqual(job.name, "jobs.tests.common.explode")
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertIn("ValueError: Test failure.", job.last_error)
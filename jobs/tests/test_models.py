@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Job
+from .common import record, explode
+
+
+class JobTests(TestCase):
+    def test_enqueue_job(self):
+        job = record.enqueue("test")
+
+        self.assertEqual(job.name, "jobs.tests.common.record")
+        self.assertEqual(job.args, ["test"])
+        self.assertEqual(job.key, "test:test")
+        self.assertEqual(job.status, Job.Status.QUEUED)
+
+    def test_enqueue_job_idempotent(self):
+        job = record.enqueue("test")
+
+        self.assertEqual(record.enqueue("test"), job)
+        self.assertNotEqual(record.enqueue("other"), job)
+        self.assertEqual(Job.objects.count(), 2)
+
+        claimed = Job.objects.claim()
+
+        self.assertEqual(claimed, job)
+        self.assertEqual(claimed.status, Job.Status.RUNNING)
+
+        # The running job may have read outdated data.
+        self.assertNotEqual(record.enqueue("test"), job)
+
+    def test_claim_job(self):
+        Job.objects.enqueue(
+            "jobs.tests.common.record",
+            ["later"],
+            run_after=timezone.now() + timedelta(hours=1)
+        )
+        job = record.enqueue("now")
+
+        claimed = Job.objects.claim()
+
+        self.assertEqual(claimed, job)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(Job.objects.claim())
+
+        # The worker running the job died.
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now())
+
+        claimed = Job.objects.claim()
+
+        self.assertEqual(claimed, job)
+        self.assertEqual(claimed.attempts, 2)
+
+    @override_settings(JOBS_RETRY_DELAY=10)
+    def test_fail_job(self):
+        job = explode.enqueue()
+
+        job = Job.objects.claim()
+        job.fail("Test failure.")
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertEqual(job.last_error, "Test failure.")
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=5))
+        self.assertIsNone(Job.objects.claim())
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+        job = Job.objects.claim()
+        job.fail("Test failure.")
+        job.refresh_from_db()
+
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIsNone(Job.objects.claim())
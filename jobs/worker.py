@@ -0,0 +1,46 @@
+import logging
+import traceback
+
+from django.db import close_old_connections, connections
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+
+def run_next():
+    """
+    Claim the next due job and run it.
+    Returns the job, or None if there was nothing to do.
+    """
+    job = Job.objects.claim()
+    if job is None:
+        return None
+
+    try:
+        job.run()
+    except Exception:
+        logger.exception("Job %s failed (attempt %s).", job.name, job.attempts)
+        job.fail(traceback.format_exc())
+    else:
+        job.succeed()
+
+    return job
+
+
+def work(stop, poll_interval, burst=False):
+    """
+    Run jobs until stop is set. In burst mode,
+    return as soon as there are no due jobs.
+    """
+    try:
+        while not stop.is_set():
+            close_old_connections()
+
+            if run_next() is None:
+                if burst:
+                    return
+                stop.wait(poll_interval)
+    finally:
+        connections.close_all()
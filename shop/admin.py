@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from . import models
+from . import models, tasks
 
 
 # Register your models here.
@@ -9,10 +9,40 @@ class ItemPhotoInline(admin.TabularInline):
     extra = 1
 
 
+class OrderLineInline(admin.TabularInline):
+    model = models.OrderLine
+    extra = 0
+
+
 class ItemAdmin(admin.ModelAdmin):
     inlines = [ItemPhotoInline]
 
 
+class OrderAdmin(admin.ModelAdmin):
+    inlines = [OrderLineInline]
+
+
+class ItemReviewAdmin(admin.ModelAdmin):
+    """
+    Reviews edited here bypass the API views,
+    so the item ratings are rebuilt in the background
+    after every change.
+    """
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        tasks.rebuild_item_ratings.enqueue([obj.item_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        tasks.rebuild_item_ratings.enqueue([obj.item_id])
+
+    def delete_queryset(self, request, queryset):
+        item_ids = list(queryset.values_list("item_id", flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        tasks.rebuild_item_ratings.enqueue(item_ids)
+
+
 admin.site.register(models.Item, ItemAdmin)
-admin.site.register(models.ItemReview)
+admin.site.register(models.ItemReview, ItemReviewAdmin)
 admin.site.register(models.Cart)
+admin.site.register(models.Order, OrderAdmin)
@@ -0,0 +1,76 @@
+"""
+Async read path for DRF views.
+
+DRF views are synchronous, so under ASGI every request runs in a
+worker thread for its whole lifetime. Views with AsyncReadMixin
+handle reads in an async "aget" method instead, on the event loop,
+and only use threads for database queries.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.views.decorators.csrf import csrf_exempt
+
+
+class AsyncReadMixin:
+    """
+    Serves GET and HEAD requests with the async aget() handler.
+    Other requests run the regular view in a worker thread.
+
+    aget() must not access the database synchronously. Querysets
+    are evaluated with the async ORM, and serializers only read
+    data that was loaded beforehand.
+
+    GET and HEAD never reach the synchronous handlers of the
+    view, so subclasses must implement aget().
+    """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        if cls.aget is AsyncReadMixin.aget:
+            raise ImproperlyConfigured(f"{cls.__name__} must implement aget().")
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        sync_view = sync_to_async(super().as_view(**initkwargs))
+
+        async def view(request, *args, **kwargs):
+            if request.method in ("GET", "HEAD"):
+                self = cls(**initkwargs)
+                return await self.adispatch(request, *args, **kwargs)
+
+            return await sync_view(request, *args, **kwargs)
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+
+        return csrf_exempt(view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        Like APIView.dispatch(), but awaits aget().
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            if "HTTP_AUTHORIZATION" in request.META:
+                # Authentication looks the user up in the database.
+                await sync_to_async(self.perform_authentication)(request)
+
+            self.initial(request, *args, **kwargs)
+            response = await self.aget(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+
+        return self.response
+
+    async def aget(self, request, *args, **kwargs):
+        """
+        Return the response to a GET or HEAD request.
+        """
+        raise NotImplementedError
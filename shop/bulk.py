@@ -0,0 +1,194 @@
+"""
+Bulk import and export of items as CSV or JSON Lines.
+
+Both directions stream. Imports read and validate one row at a time
+and insert valid rows in batches, exports read items in chunks, so
+memory use doesn't grow with the size of the catalogue.
+"""
+import codecs
+import csv
+import json
+from itertools import batched
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from config.renderers import FastJSONRenderer, orjson
+from . import caching
+from .models import Item
+from .serializers import ItemImportSerializer
+from .signals import warm_catalogue
+
+CSV = "csv"
+JSONL = "jsonl"
+
+# Media types of the formats, the first one is used for exports.
+MEDIA_TYPES = {
+    CSV: ["text/csv"],
+    JSONL: ["application/jsonl", "application/x-ndjson", "application/x-jsonlines"],
+}
+
+# Columns of exported items. Imports ignore the read-only ones,
+# so exported files can be imported again.
+EXPORT_FIELDS = ["id", "name", "description", "price", "stock", "available", "created_at"]
+
+# Invalid rows reported with their errors, others are only counted.
+MAX_REPORTED_ERRORS = 100
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def get_format(media_type):
+    """
+    Return the format of the given media type, if it's supported.
+    """
+    for format, media_types in MEDIA_TYPES.items():
+        if media_type in media_types:
+            return format
+
+    return None
+
+
+def read_rows(lines, format):
+    """
+    Parse lines of bytes, yielding (row number, row) pairs.
+    Rows that can't be parsed are yielded as ValidationError.
+    """
+    lines = codecs.iterdecode(lines, "utf-8-sig")
+
+    if format == CSV:
+        yield from enumerate(csv.DictReader(lines), 1)
+        return
+
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+
+        number += 1
+        try:
+            yield number, _loads(line)
+        except ValueError as exc:
+            yield number, ValidationError([f"Invalid JSON - {exc}"])
+
+
+def import_items(lines, format, seller, batch_size=1000):
+    """
+    Create items of the seller from CSV or JSON Lines rows.
+
+    Valid rows are inserted batch_size at a time, each batch in its own
+    transaction, and invalid ones are reported with their row numbers.
+    Return a report with the numbers of created items and invalid rows,
+    and the errors of the first MAX_REPORTED_ERRORS invalid rows.
+    """
+    serializer = ItemImportSerializer()
+    nullable = {name for name, field in serializer.fields.items() if field.allow_null}
+
+    report = {"created": 0, "invalid": 0, "errors": []}
+    batch = []
+
+    def add_error(number, detail):
+        report["invalid"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": number, "errors": detail})
+
+    number = 0
+    try:
+        for number, row in read_rows(lines, format):
+            # CSV has no null, empty cells of nullable fields stand for it.
+            if format == CSV:
+                row = {
+                    name: None if value == "" and name in nullable else value
+                    for name, value in row.items()
+                }
+
+            try:
+                if isinstance(row, ValidationError):
+                    raise row
+
+                batch.append(Item(seller=seller, **serializer.run_validation(row)))
+            except ValidationError as exc:
+                add_error(number, exc.detail)
+
+            if len(batch) >= batch_size:
+                report["created"] += insert_items(batch)
+                batch = []
+    except (UnicodeDecodeError, csv.Error) as exc:
+        # The rest of the file can't be read.
+        add_error(number + 1, [f"Parse error - {exc}"])
+
+    if batch:
+        report["created"] += insert_items(batch)
+
+    if report["created"]:
+        warm_catalogue()
+
+    return report
+
+
+def insert_items(items):
+    """
+    Insert the items in one transaction, doing what
+    Item.save() and its signals would do in bulk.
+    """
+    with transaction.atomic():
+        items = Item.objects.bulk_create(items)
+        Item.objects.filter(pk__in=[item.pk for item in items]).update_search_vector()
+        caching.invalidate_catalogue()
+
+    return len(items)
+
+
+class _Echo:
+    # File-like object for csv.writer, which returns the written row.
+    def write(self, value):
+        return value
+
+
+def export_items(queryset, format, chunk_size=2000):
+    """
+    Yield the items of the queryset as CSV or JSON Lines, a chunk
+    of chunk_size items at a time. Items are read with a server-side
+    cursor where the database supports it, in no particular order,
+    which spares the database a sort.
+    """
+    rows = queryset.order_by().values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+    if format == CSV:
+        writer = csv.writer(_Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+
+        for chunk in batched(rows, chunk_size):
+            yield "".join(writer.writerow(row) for row in chunk)
+    else:
+        renderer = FastJSONRenderer()
+
+        for chunk in batched(rows, chunk_size):
+            yield b"".join(
+                renderer.render(_to_json(row)) + b"\n" for row in chunk
+            )
+
+
+async def aexport_items(queryset, format, chunk_size=2000):
+    """
+    Async version of export_items(), for responses served under
+    ASGI, which would read a synchronous iterator in full before
+    sending anything. Chunks are still read in a worker thread.
+    """
+    chunks = export_items(queryset, format, chunk_size)
+    next_chunk = sync_to_async(next)
+
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
+
+
+def _to_json(row):
+    data = dict(zip(EXPORT_FIELDS, row))
+    # Like in API responses, prices are strings to keep their precision.
+    data["price"] = str(data["price"])
+
+    return data
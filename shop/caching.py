@@ -0,0 +1,212 @@
+"""
+Versioned cache of serialized catalogue responses.
+
+Cache keys embed version numbers. Changes bump the versions
+instead of deleting keys, so stale entries are never read
+again and simply expire.
+"""
+import time
+import hashlib
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from config.routers import pin_primary
+from .conditional import make_etag
+
+# Bumped when anything embedded in every representation changes (e.g. usernames).
+GENERATION_KEY = "shop:generation"
+
+# Bumped when any item changes, invalidates all list pages.
+CATALOGUE_VERSION_KEY = "shop:catalogue:version"
+
+# When the catalogue last changed, used as its Last-Modified date.
+CATALOGUE_MODIFIED_KEY = "shop:catalogue:modified"
+
+
+# Bumped when any user changes, with the time of the change.
+USERS_VERSION_KEY = "users:version"
+USERS_MODIFIED_KEY = "users:modified"
+
+
+def item_version_key(pk):
+    return f"shop:item:{pk}:version"
+
+
+def cart_version_key(owner_pk):
+    return f"shop:cart:{owner_pk}:version"
+
+
+def get_versions(*keys):
+    """
+    Return the current values of the given version keys,
+    initializing missing ones.
+    """
+    versions = cache.get_many(keys)
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # Start from a unique value, so that a version that was evicted
+        # from the cache doesn't bring entries from before back to life.
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+
+        versions.update(cache.get_many(missing))
+
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(*keys):
+    """
+    Async version of get_versions().
+    """
+    versions = await cache.aget_many(keys)
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+
+        versions.update(await cache.aget_many(missing))
+
+    return [versions[key] for key in keys]
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+async def aget_catalogue_validators():
+    """
+    Return the (etag, last_modified) pair of the item list.
+    """
+    generation, version = await aget_versions(GENERATION_KEY, CATALOGUE_VERSION_KEY)
+
+    return (
+        make_etag("items", generation, version),
+        await cache.aget(CATALOGUE_MODIFIED_KEY)
+    )
+
+
+def get_users_validators():
+    """
+    Return the (etag, last_modified) pair of the user list.
+    """
+    version, = get_versions(USERS_VERSION_KEY)
+
+    return make_etag("users", version), cache.get(USERS_MODIFIED_KEY)
+
+
+def _touch_catalogue():
+    cache.set(CATALOGUE_MODIFIED_KEY, timezone.now().replace(microsecond=0), timeout=None)
+
+
+def _pin_primary_if_changed(last_modified):
+    # Replicas may not have caught up with a recent change yet, and
+    # whatever is cached now would outlive their lag. The modification
+    # time is rounded down to seconds, hence the extra second.
+    lag = timedelta(seconds=settings.DATABASE_REPLICA_LAG + 1)
+    if last_modified and timezone.now() - last_modified < lag:
+        pin_primary()
+
+
+def pin_primary_for_fill():
+    """
+    Call before loading data to cache, so that it's read
+    from the primary database shortly after changes.
+    """
+    _pin_primary_if_changed(cache.get(CATALOGUE_MODIFIED_KEY))
+
+
+async def apin_primary_for_fill():
+    _pin_primary_if_changed(await cache.aget(CATALOGUE_MODIFIED_KEY))
+
+
+def get_request_digest(request):
+    return hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+
+
+async def aget_list_key(request):
+    generation, version = await aget_versions(GENERATION_KEY, CATALOGUE_VERSION_KEY)
+
+    return f"shop:items:{generation}:{version}:{get_request_digest(request)}"
+
+
+async def aget_item_key(request, pk):
+    generation, version = await aget_versions(GENERATION_KEY, item_version_key(pk))
+
+    return f"shop:item:{pk}:{generation}:{version}:{get_request_digest(request)}"
+
+
+def get_cart_key(owner_pk):
+    # Changes to the items in the cart bump its version
+    # as well, see shop.signals.
+    generation, version = get_versions(GENERATION_KEY, cart_version_key(owner_pk))
+
+    return f"shop:cart:{owner_pk}:{generation}:{version}"
+
+
+def _on_change(func):
+    # Invalidate right away, and once more after the transaction commits,
+    # in case a concurrent read cached the old data in between.
+    func()
+    transaction.on_commit(func)
+
+
+def invalidate_item(pk):
+    """
+    Invalidate cached representations of an item
+    and all list pages.
+    """
+    def bump():
+        bump_version(item_version_key(pk))
+        bump_version(CATALOGUE_VERSION_KEY)
+        _touch_catalogue()
+
+    _on_change(bump)
+
+
+def invalidate_cart(owner_pk):
+    """
+    Invalidate the cached summary of a user's cart.
+    """
+    _on_change(lambda: bump_version(cart_version_key(owner_pk)))
+
+
+def invalidate_catalogue():
+    """
+    Invalidate all list pages, e.g. after items
+    were created in bulk.
+    """
+    def bump():
+        bump_version(CATALOGUE_VERSION_KEY)
+        _touch_catalogue()
+
+    _on_change(bump)
+
+
+def invalidate_all():
+    """
+    Invalidate every cached representation.
+    """
+    def bump():
+        bump_version(GENERATION_KEY)
+        _touch_catalogue()
+
+    _on_change(bump)
+
+
+def invalidate_users():
+    """
+    Invalidate the validators of the user list.
+    """
+    def bump():
+        bump_version(USERS_VERSION_KEY)
+        cache.set(USERS_MODIFIED_KEY, timezone.now().replace(microsecond=0), timeout=None)
+
+    _on_change(bump)
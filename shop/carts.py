@@ -0,0 +1,71 @@
+"""
+Changes to the contents of users' carts.
+
+Cart lines are written directly, in bulk, which bypasses
+m2m_changed and auto_now, so changed carts are touched.
+"""
+from django.utils import timezone
+
+from . import caching
+from .models import Cart, CartLine
+
+ADD = "add"
+REMOVE = "remove"
+
+
+def touch(cart):
+    """
+    Mark the cart as changed. It must be loaded with its owner.
+    """
+    Cart.objects.filter(pk=cart.pk).update(updated_at=timezone.now())
+    caching.invalidate_cart(cart.owner_id)
+
+
+def add_lines(lines, set_quantity):
+    """
+    Insert cart lines in one statement. Lines of items that are
+    already in the cart keep their price, which is captured when
+    the item is first added, and their quantity is only replaced
+    if set_quantity is true.
+    """
+    if set_quantity:
+        CartLine.objects.bulk_create(
+            lines,
+            update_conflicts=True,
+            unique_fields=["cart", "item"],
+            update_fields=["quantity"]
+        )
+    else:
+        CartLine.objects.bulk_create(lines, ignore_conflicts=True)
+
+
+def apply(cart, operations):
+    """
+    Apply add and remove operations, validated by
+    CartUpdateSerializer, to the cart. The last operation
+    on an item wins. Items added with and without a
+    quantity take an insert each, removed ones a delete.
+    """
+    latest = {operation["item"]: operation for operation in operations}
+
+    for set_quantity in (True, False):
+        lines = [
+            CartLine(
+                cart_id=cart.pk,
+                item_id=operation["item"],
+                price=operation["price"],
+                quantity=operation.get("quantity", 1)
+            )
+            for operation in latest.values()
+            if operation["action"] == ADD and ("quantity" in operation) == set_quantity
+        ]
+        if lines:
+            add_lines(lines, set_quantity)
+
+    removed = [
+        operation["item"] for operation in latest.values() if operation["action"] == REMOVE
+    ]
+    if removed:
+        CartLine.objects.filter(cart_id=cart.pk, item_id__in=removed).delete()
+
+    touch(cart)
@@ -0,0 +1,22 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Cached responses and the versions that invalidate them
+    are only seen by the process that wrote them if the cache
+    is local, so other processes serve stale data.
+    """
+    if isinstance(caches["default"], LocMemCache):
+        return [
+            Error(
+                "The default cache is local to each process.",
+                hint="Set CACHE_LOCATION to a Redis URL, or configure another shared cache.",
+                id="shop.E001",
+            )
+        ]
+
+    return []
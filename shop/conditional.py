@@ -0,0 +1,90 @@
+"""
+Helpers for conditional requests (ETag and Last-Modified).
+
+Views compute validators from cheap version information
+(timestamps or cache versions), so conditional requests are
+answered before anything is serialized.
+"""
+import hashlib
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
+
+    return f'"{digest}"'
+
+
+def check_preconditions(request, etag, last_modified):
+    """
+    Return a 304 or 412 response if the request preconditions
+    call for one, or None if the request should be served.
+    """
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified and int(last_modified.timestamp()),
+    )
+
+
+def set_validators(response, etag, last_modified):
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+
+    return response
+
+
+class ConditionalMixin:
+    """
+    View mixin that adds ETag and Last-Modified headers
+    to retrieve responses, answers If-None-Match and
+    If-Modified-Since without serializing the object,
+    and checks If-Match on updates.
+
+    Updates lock the object's row before checking the
+    preconditions, so two requests with the same If-Match
+    can't both succeed, one of them gets a 412.
+    """
+    def get_validators(self):
+        """
+        Return the (etag, last_modified) pair
+        of the requested object.
+        """
+        raise NotImplementedError
+
+    def retrieve(self, request, *args, **kwargs):
+        self.validators = self.get_validators()
+
+        response = check_preconditions(request, *self.validators)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+
+        return set_validators(response, *self.validators)
+
+    def lock_object(self):
+        """
+        Lock the row of the requested object until
+        the end of the transaction.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+
+        get_object_or_404(
+            self.get_queryset().model._default_manager.select_for_update().values_list("pk"),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            self.lock_object()
+
+            response = check_preconditions(request, *self.get_validators())
+            if response is not None:
+                return response
+
+            response = super().update(request, *args, **kwargs)
+
+        return set_validators(response, *self.get_validators())
@@ -0,0 +1,20 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class Conflict(APIException):
+    """
+    The request can't be served in the current state
+    of the resources, e.g. items that ran out.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The request conflicts with the current state of the resource."
+    default_code = "conflict"
+
+    def __init__(self, detail=None, code=None, items=None):
+        super().__init__(detail, code)
+
+        # The ids of the conflicting items are kept as numbers,
+        # APIException would turn them into strings.
+        if items is not None:
+            self.detail = {"detail": self.detail, "items": items}
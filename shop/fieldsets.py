@@ -0,0 +1,110 @@
+"""
+Sparse fieldsets for read requests.
+
+Clients choose the fields of a representation with the "fields"
+query parameter, and its nested objects with "expand", e.g.
+"?fields=id,name,price&expand=seller". Nested objects can be named
+in either. Once "fields" is given, only the plain fields it names
+are kept, and so are nested objects if one of the parameters names
+them. "expand" alone only limits nested objects, so "?expand="
+leaves them all out and keeps every plain field.
+
+Views load only what the chosen fields need, see get_only_fields().
+"""
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+EXPAND_PARAM = "expand"
+
+
+def is_nested(field):
+    return isinstance(field, serializers.BaseSerializer)
+
+
+def parse_names(request, param):
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def select_fields(fields, request):
+    """
+    Return the fields chosen by the request's query parameters.
+    """
+    names = parse_names(request, FIELDS_PARAM)
+    expand = parse_names(request, EXPAND_PARAM)
+
+    for param, given, available in (
+        (FIELDS_PARAM, names, fields),
+        (EXPAND_PARAM, expand, [name for name, f in fields.items() if is_nested(f)]),
+    ):
+        unknown = (given or set()) - set(available)
+        if unknown:
+            raise ValidationError(
+                {param: [f"Unknown fields: {', '.join(sorted(unknown))}."]}
+            )
+
+    if names is None and expand is None:
+        return fields
+
+    nested = (names or set()) | (expand or set())
+
+    def is_selected(name, field):
+        if is_nested(field):
+            return name in nested
+
+        return names is None or name in names
+
+    # Keep the declared order.
+    return {name: f for name, f in fields.items() if is_selected(name, f)}
+
+
+def get_only_fields(fields, *extra, related=()):
+    """
+    Names of the model fields read by the plain serializer fields,
+    plus the given extra ones, to be passed to QuerySet.only().
+    The nested fields named in related are objects loaded with
+    select_related(), their plain fields are included as well.
+    """
+    names = set(extra)
+
+    for name, field in fields.items():
+        if not is_nested(field):
+            names.add(field.source)
+            # Image fields that serve variants, see VariantImageField.
+            if hasattr(field, "variants_field"):
+                names.add(field.variants_field)
+        elif name in related:
+            names.update(
+                f"{field.source}__{related_name}"
+                for related_name in get_only_fields(field.fields)
+            )
+
+    return names
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin that drops the fields a read request
+    didn't ask for. Only applies to the top-level serializer,
+    nested ones always have all of their fields.
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+
+        if request is None or request.method not in SAFE_METHODS or not self.is_root():
+            return fields
+
+        return select_fields(fields, request)
+
+    def is_root(self):
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+
+        return parent is None
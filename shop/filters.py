@@ -0,0 +1,125 @@
+from decimal import Decimal, InvalidOperation
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from django.db import connections
+from django.db.models import F, Q
+from django.contrib.postgres.search import SearchQuery, SearchRank
+
+from .models import SEARCH_CONFIG
+
+
+class ItemSearchFilter(BaseFilterBackend):
+    """
+    This filter searches items by name and description.
+    On PostgreSQL it uses the indexed search vector and ranks
+    the results, other databases fall back to substring matching.
+    """
+    search_param = "q"
+
+    def get_search_terms(self, request):
+        return request.query_params.get(self.search_param, "").strip()
+
+    def is_ranked(self, request, queryset):
+        return bool(self.get_search_terms(request)) and \
+            connections[queryset.db].vendor == "postgresql"
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        if self.is_ranked(request, queryset):
+            query = SearchQuery(terms, search_type="websearch", config=SEARCH_CONFIG)
+
+            return queryset.filter(search_vector=query).annotate(
+                rank=SearchRank(F("search_vector"), query)
+            )
+
+        for term in terms.split():
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(description__icontains=term)
+            )
+
+        return queryset
+
+
+class ItemFilter(BaseFilterBackend):
+    """
+    This filter narrows items down by price range,
+    availability and seller.
+    """
+    def parse(self, request, param, parser):
+        value = request.query_params.get(param)
+        if value in (None, ""):
+            return None
+
+        try:
+            return parser(value)
+        except (ValueError, InvalidOperation):
+            raise ValidationError({param: [f"Invalid value: {value!r}."]})
+
+    def parse_decimal(self, value):
+        value = Decimal(value)
+        if not value.is_finite():
+            raise ValueError(value)
+
+        return value
+
+    def parse_id(self, value):
+        # Ids outside the 64-bit range can't be compared
+        # with the column by every database.
+        value = int(value)
+        if not -2**63 <= value < 2**63:
+            raise ValueError(value)
+
+        return value
+
+    def parse_bool(self, value):
+        value = value.lower()
+        if value in ("true", "1"):
+            return True
+        if value in ("false", "0"):
+            return False
+
+        raise ValueError(value)
+
+    def filter_queryset(self, request, queryset, view):
+        price_min = self.parse(request, "price_min", self.parse_decimal)
+        price_max = self.parse(request, "price_max", self.parse_decimal)
+        available = self.parse(request, "available", self.parse_bool)
+        seller = self.parse(request, "seller", self.parse_id)
+
+        if price_min is not None:
+            queryset = queryset.filter(price__gte=price_min)
+        if price_max is not None:
+            queryset = queryset.filter(price__lte=price_max)
+        if available is not None:
+            queryset = queryset.filter(available=available)
+        if seller is not None:
+            queryset = queryset.filter(seller_id=seller)
+
+        return queryset
+
+
+class ItemOrderingFilter(OrderingFilter):
+    """
+    Ordering filter for the item catalogue.
+    Only a single ordering field is used, with the id
+    as a tie-breaker, so that it can serve as a cursor.
+    Search results are ordered by relevance by default.
+    """
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        fields = []
+        if params:
+            fields = [param.strip() for param in params.split(",")]
+            fields = self.remove_invalid_fields(queryset, fields, view, request)
+
+        if fields:
+            field = fields[0]
+        elif ItemSearchFilter().is_ranked(request, queryset):
+            field = "-rank"
+        else:
+            field = self.get_default_ordering(view)[0]
+
+        return (field, "-id" if field.startswith("-") else "id")
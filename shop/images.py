@@ -0,0 +1,111 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+
+from . import caching
+from .models import Item, ItemPhoto
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+
+def generate_variants(file):
+    """
+    Save a re-encoded copy of the image for every width
+    in IMAGE_VARIANTS, next to the original.
+    Images are never upscaled.
+    Returns the name of the source file and the name,
+    width and height of each variant.
+    """
+    image_format = settings.IMAGE_VARIANT_FORMAT
+    stem = PurePosixPath(file.name).with_suffix("")
+
+    with file.open("rb"), Image.open(file) as image:
+        image = ImageOps.exif_transpose(image)
+
+        if image_format == "JPEG" or image.mode not in ("RGB", "RGBA"):
+            has_alpha = image_format != "JPEG" and image.has_transparency_data
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        variants = {"source": file.name}
+        for size, width in settings.IMAGE_VARIANTS.items():
+            variant = image.copy()
+            variant.thumbnail((width, image.height))
+
+            buffer = BytesIO()
+            variant.save(buffer, image_format, quality=settings.IMAGE_VARIANT_QUALITY)
+
+            variants[size] = {
+                "name": file.storage.save(
+                    f"{stem}_{size}.{EXTENSIONS[image_format]}",
+                    ContentFile(buffer.getvalue())
+                ),
+                "width": variant.width,
+                "height": variant.height,
+            }
+
+    return variants
+
+
+def delete_variants(storage, variants):
+    for size, variant in variants.items():
+        if size != "source":
+            storage.delete(variant["name"])
+
+
+def _update_variants(instance, field, variants_field, **extra):
+    """
+    Regenerate the variants of an image field.
+    The new variants are only stored if the image hasn't
+    been replaced in the meantime.
+    Returns whether they were stored.
+    """
+    file = getattr(instance, field)
+    old_variants = getattr(instance, variants_field)
+    variants = generate_variants(file) if file else {}
+
+    queryset = type(instance)._default_manager.filter(pk=instance.pk)
+    if file:
+        queryset = queryset.filter(**{field: file.name})
+    else:
+        queryset = queryset.filter(Q(**{field: ""}) | Q(**{f"{field}__isnull": True}))
+
+    updated = queryset.update(**{variants_field: variants}, **extra)
+
+    if updated:
+        delete_variants(file.storage, old_variants)
+    else:
+        delete_variants(file.storage, variants)
+
+    return bool(updated)
+
+
+def generate_photo_variants(pk):
+    """
+    Regenerate the variants of an item photo.
+    """
+    photo = ItemPhoto.objects.filter(pk=pk).first()
+
+    if photo is not None and _update_variants(photo, "photo", "variants"):
+        Item.objects.filter(pk=photo.item_id).update(updated_at=timezone.now())
+        caching.invalidate_item(photo.item_id)
+
+
+def generate_profile_pic_variants(pk):
+    """
+    Regenerate the variants of a user's profile picture.
+    """
+    user = get_user_model().objects.filter(pk=pk).first()
+
+    if user is not None and _update_variants(
+        user,
+        "profile_pic",
+        "profile_pic_variants",
+        updated_at=timezone.now()
+    ):
+        caching.invalidate_users()
@@ -0,0 +1,137 @@
+"""
+Stock counts and reservations.
+
+Stock is taken with conditional updates, "UPDATE ... SET stock = stock - n
+WHERE stock >= n", instead of reading it and writing it back, so concurrent
+buyers can't oversell an item, and only hold its row for one statement.
+
+Items without a stock count aren't tracked, they can be reserved and
+bought in any quantity.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, F, Value, When
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from . import caching, tasks
+from .exceptions import Conflict
+from .models import Item, StockReservation
+
+
+def take_stock(item_id, quantity):
+    """
+    Take quantity items out of stock, or raise Conflict
+    if there aren't enough of them.
+    """
+    # Most updates don't change the availability of the item,
+    # which is the only part of the stock in its representation.
+    if Item.objects.filter(pk=item_id, stock__gt=quantity).update(
+        stock=F("stock") - quantity
+    ):
+        return
+
+    if Item.objects.filter(pk=item_id, stock=quantity).update(
+        stock=0, updated_at=timezone.now()
+    ):
+        caching.invalidate_item(item_id)
+        return
+
+    stock = get_object_or_404(Item.objects.values_list("stock", flat=True), pk=item_id)
+    if stock is not None:
+        raise Conflict("Not enough items in stock.", items=[item_id])
+
+
+def reserve(item_id, user, quantity):
+    """
+    Hold quantity items for the user until the reservation
+    expires, see STOCK_RESERVATION_TTL.
+    """
+    with transaction.atomic():
+        take_stock(item_id, quantity)
+
+        reservation = StockReservation.objects.create(
+            item_id=item_id,
+            user=user,
+            quantity=quantity,
+            expires_at=timezone.now() + timedelta(seconds=settings.STOCK_RESERVATION_TTL)
+        )
+
+    # Queued outside of the transaction, so that reservations
+    # of the same item don't wait for each other's job row.
+    tasks.release_expired_reservations.enqueue_at(reservation.expires_at)
+
+    return reservation
+
+
+def return_stock(quantities):
+    """
+    Add the quantities, a mapping of item ids to numbers
+    of items, back to stock.
+    """
+    if not quantities:
+        return
+
+    now = timezone.now()
+
+    # Conditions are evaluated on the rows before the update,
+    # so sold out items are the ones with no stock yet.
+    Item.objects.filter(pk__in=quantities).update(
+        stock=Case(
+            *(When(pk=pk, then=F("stock") + quantity) for pk, quantity in quantities.items())
+        ),
+        updated_at=Case(When(stock=0, then=Value(now)), default=F("updated_at"))
+    )
+
+    for pk in Item.objects.filter(pk__in=quantities, updated_at=now).values_list("pk", flat=True):
+        caching.invalidate_item(pk)
+
+
+def release_expired(batch_size=500):
+    """
+    Delete expired reservations and put their items back
+    to stock, in batches. Return the number of released
+    reservations.
+    """
+    # Where the database supports it, concurrent releases skip rows
+    # locked by others, like workers claiming jobs do. On SQLite, a
+    # transaction fails rather than release the same rows twice.
+    db = StockReservation.objects.db
+    skip_locked = connections[db].features.has_select_for_update_skip_locked
+    released = 0
+
+    while True:
+        with transaction.atomic():
+            expired = StockReservation.objects.filter(
+                expires_at__lte=timezone.now()
+            ).order_by("expires_at", "pk")
+
+            if skip_locked:
+                expired = expired.select_for_update(skip_locked=True)
+
+            expired = list(expired.values_list("pk", "item_id", "quantity")[:batch_size])
+            if not expired:
+                break
+
+            quantities = Counter()
+            for _, item_id, quantity in expired:
+                quantities[item_id] += quantity
+
+            StockReservation.objects.filter(pk__in=[pk for pk, _, _ in expired]).delete()
+            return_stock(quantities)
+
+        released += len(expired)
+
+    return released
+
+
+def next_expiry():
+    """
+    Return when the next reservation expires, if any.
+    """
+    return StockReservation.objects.order_by("expires_at").values_list(
+        "expires_at", flat=True
+    ).first()
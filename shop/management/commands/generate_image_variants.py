@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from shop import images
+from shop.models import ItemPhoto
+
+
+class Command(BaseCommand):
+    help = "Generate resized variants of item photos and profile pictures that don't have them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate the variants of every image."
+        )
+
+    def handle(self, *args, **options):
+        targets = [
+            (ItemPhoto.objects.all(), "photo", "variants",
+             images.generate_photo_variants),
+            (get_user_model().objects.exclude(profile_pic=""), "profile_pic",
+             "profile_pic_variants", images.generate_profile_pic_variants),
+        ]
+
+        generated = 0
+        for queryset, field, variants_field, generate in targets:
+            rows = queryset.exclude(**{f"{field}__isnull": True}).values_list(
+                "pk", field, variants_field
+            )
+
+            for pk, name, variants in rows.iterator():
+                if options["force"] or variants.get("source") != name:
+                    generate(pk)
+                    generated += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated variants of {generated} images."))
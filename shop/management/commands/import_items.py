@@ -0,0 +1,52 @@
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from shop import bulk
+
+
+class Command(BaseCommand):
+    help = "Create items of a seller from a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help='File to import, "-" for standard input.')
+        parser.add_argument("--seller", required=True, help="Username of the seller.")
+        parser.add_argument(
+            "--format",
+            choices=list(bulk.MEDIA_TYPES),
+            help="Format of the file, by default its extension."
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            seller = get_user_model().objects.get(username=options["seller"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'There is no user "{options["seller"]}".')
+
+        format = options["format"] or Path(options["path"]).suffix.lstrip(".").lower()
+        if format == "ndjson":
+            format = bulk.JSONL
+        if format not in bulk.MEDIA_TYPES:
+            raise CommandError("Can't tell the format of the file, use --format.")
+
+        try:
+            file = nullcontext(sys.stdin.buffer) if options["path"] == "-" \
+                else open(options["path"], "rb")
+        except OSError as exc:
+            raise CommandError(exc)
+
+        with file as lines:
+            report = bulk.import_items(lines, format, seller, batch_size=options["batch_size"])
+
+        for error in report["errors"]:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if report["invalid"] > len(report["errors"]):
+            self.stderr.write(f"{report['invalid'] - len(report['errors'])} more invalid rows.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {report['created']} items, {report['invalid']} rows were invalid."
+        ))
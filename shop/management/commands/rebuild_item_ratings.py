@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from shop.models import Item
+
+
+class Command(BaseCommand):
+    help = "Recompute review counts and average rates of items from their reviews."
+
+    def handle(self, *args, **options):
+        updated = Item.objects.rebuild_ratings()
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings of {updated} items."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from shop import inventory
+
+
+class Command(BaseCommand):
+    help = "Put the items of expired stock reservations back to stock."
+
+    def handle(self, *args, **options):
+        released = inventory.release_expired()
+
+        self.stdout.write(self.style.SUCCESS(f"Released {released} reservations."))
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+from shop import ratings
+
+
+def rebuild_ratings(apps, schema_editor):
+    Item = apps.get_model("shop", "Item")
+    ItemReview = apps.get_model("shop", "ItemReview")
+    db = schema_editor.connection.alias
+
+    Item.objects.using(db).update(
+        **ratings.rebuilt_ratings(ItemReview.objects.using(db))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0002_item_created_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="item",
+            name="rating_avg",
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="item",
+            name="rating_sum",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="item",
+            name="review_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["rating_avg", "id"], name="shop_item_rating_id_idx"
+            ),
+        ),
+        migrations.RunPython(rebuild_ratings, migrations.RunPython.noop),
+    ]
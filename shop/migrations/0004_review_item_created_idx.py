@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0003_item_review_aggregates"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="itemreview",
+            index=models.Index(
+                fields=["item", "created_at"], name="shop_review_item_created_idx"
+            ),
+        ),
+    ]
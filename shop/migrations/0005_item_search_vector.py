@@ -0,0 +1,65 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:18
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+SEARCH_INDEX = django.contrib.postgres.indexes.GinIndex(
+    fields=["search_vector"], name="shop_item_search_idx"
+)
+
+
+def add_search_index(apps, schema_editor):
+    # GIN indexes and search vectors only exist on PostgreSQL,
+    # other databases fall back to substring matching.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Item = apps.get_model("shop", "Item")
+    schema_editor.add_index(Item, SEARCH_INDEX)
+
+    Item.objects.update(
+        search_vector=(
+            django.contrib.postgres.search.SearchVector(
+                "name", weight="A", config="english"
+            )
+            + django.contrib.postgres.search.SearchVector(
+                "description", weight="B", config="english"
+            )
+        )
+    )
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    Item = apps.get_model("shop", "Item")
+    schema_editor.remove_index(Item, SEARCH_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0004_review_item_created_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="item",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name="item", index=SEARCH_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(add_search_index, remove_search_index),
+            ],
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0005_item_search_vector"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(fields=["price", "id"], name="shop_item_price_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["seller", "created_at", "id"],
+                name="shop_item_seller_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                condition=models.Q(("available", True)),
+                fields=["created_at", "id"],
+                name="shop_item_avail_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                condition=models.Q(("available", True)),
+                fields=["price", "id"],
+                name="shop_item_avail_price_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0007_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="itemphoto",
+            name="variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:59
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+from shop import ratings
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    """
+    Keep only the newest review of each author per item,
+    and rebuild the ratings of the items that had duplicates.
+    """
+    Item = apps.get_model("shop", "Item")
+    ItemReview = apps.get_model("shop", "ItemReview")
+    db = schema_editor.connection.alias
+
+    duplicates = (
+        ItemReview.objects.using(db).order_by()
+        .values("item", "author")
+        .annotate(count=Count("id"), newest=Max("id"))
+        .filter(count__gt=1)
+    )
+
+    item_ids = set()
+    for group in duplicates:
+        ItemReview.objects.using(db).filter(
+            item=group["item"], author=group["author"], id__lt=group["newest"]
+        ).delete()
+        item_ids.add(group["item"])
+
+    if not item_ids:
+        return
+
+    Item.objects.using(db).filter(pk__in=item_ids).update(
+        **ratings.rebuilt_ratings(ItemReview.objects.using(db))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0008_itemphoto_variants"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="itemreview",
+            constraint=models.UniqueConstraint(
+                fields=("item", "author"), name="shop_review_item_author_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,168 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:14
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copy_cart_items(apps, schema_editor):
+    Cart = apps.get_model("shop", "Cart")
+    CartLine = apps.get_model("shop", "CartLine")
+    db = schema_editor.connection.alias
+
+    CartLine.objects.using(db).bulk_create(
+        CartLine(cart_id=cart_id, item_id=item_id, quantity=1, price=price)
+        for cart_id, item_id, price in Cart.items.through.objects.using(db).values_list(
+            "cart_id", "item_id", "item__price"
+        ).iterator()
+    )
+
+
+def copy_cart_lines(apps, schema_editor):
+    Cart = apps.get_model("shop", "Cart")
+    CartLine = apps.get_model("shop", "CartLine")
+    db = schema_editor.connection.alias
+
+    Cart.items.through.objects.using(db).bulk_create(
+        Cart.items.through(cart_id=cart_id, item_id=item_id)
+        for cart_id, item_id in CartLine.objects.using(db).values_list(
+            "cart_id", "item_id"
+        ).iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0009_review_item_author_unique"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CartLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.PositiveIntegerField(
+                        default=1,
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "cart",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lines",
+                        to="shop.cart",
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cart_lines",
+                        to="shop.item",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="Order",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("total", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "buyer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="orders",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="OrderLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=150)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                (
+                    "quantity",
+                    models.PositiveIntegerField(
+                        validators=[django.core.validators.MinValueValidator(1)]
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="order_lines",
+                        to="shop.item",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lines",
+                        to="shop.order",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="cartline",
+            constraint=models.UniqueConstraint(
+                fields=("cart", "item"), name="shop_cartline_cart_item_uniq"
+            ),
+        ),
+        # A many-to-many field can't be altered to use a through model,
+        # so the cart items are copied to cart lines and the field is
+        # added again.
+        migrations.RunPython(copy_cart_items, copy_cart_lines),
+        migrations.RemoveField(model_name="cart", name="items"),
+        migrations.AddField(
+            model_name="cart",
+            name="items",
+            field=models.ManyToManyField(
+                blank=True, through="shop.CartLine", to="shop.item"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["buyer", "created_at"], name="shop_order_buyer_created_idx"
+            ),
+        ),
+    ]
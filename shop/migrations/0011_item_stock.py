@@ -0,0 +1,116 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:20
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def set_stock(apps, schema_editor):
+    # Unavailable items are out of stock, others aren't tracked.
+    Item = apps.get_model("shop", "Item")
+    Item.objects.using(schema_editor.connection.alias).filter(available=False).update(stock=0)
+
+
+def set_available(apps, schema_editor):
+    Item = apps.get_model("shop", "Item")
+    Item.objects.using(schema_editor.connection.alias).filter(stock=0).update(
+        available=False
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shop", "0010_cart_lines_orders"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="item",
+            name="stock",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(set_stock, set_available),
+        # A field can't be altered into a generated one, so it's added
+        # again, together with the partial indexes that depend on it.
+        migrations.RemoveIndex(model_name="item", name="shop_item_avail_created_idx"),
+        migrations.RemoveIndex(model_name="item", name="shop_item_avail_price_idx"),
+        migrations.RemoveField(model_name="item", name="available"),
+        migrations.AddField(
+            model_name="item",
+            name="available",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Q(
+                    ("stock__isnull", True), ("stock__gt", 0), _connector="OR"
+                ),
+                output_field=models.BooleanField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                condition=models.Q(("available", True)),
+                fields=["created_at", "id"],
+                name="shop_item_avail_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                condition=models.Q(("available", True)),
+                fields=["price", "id"],
+                name="shop_item_avail_price_idx",
+            ),
+        ),
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.PositiveIntegerField(
+                        validators=[django.core.validators.MinValueValidator(1)]
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("expires_at", models.DateTimeField()),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="shop.item",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["expires_at"], name="shop_reservation_expires_idx"
+                    ),
+                    models.Index(
+                        fields=["user", "item"], name="shop_reservation_user_item_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -1,10 +1,89 @@
 from decimal import Decimal
-from django.db import models
+from django.db import connections, models
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from . import ratings
+
+
+# Number of reviews embedded in item representations.
+RECENT_REVIEWS_COUNT = 3
+
+# Text search configuration used for item search vectors and queries.
+SEARCH_CONFIG = "english"
+
 
 # Create your models here.
+class ItemQuerySet(models.QuerySet):
+    """
+    Custom queryset for items.
+    """
+    def with_details(self, seller=True, photos=True, reviews=True):
+        """
+        Load everything ItemSerializer needs in a fixed
+        number of queries, regardless of how many photos
+        and reviews the items have. Relations that won't
+        be serialized can be left out.
+        """
+        queryset = self
+        if seller:
+            queryset = queryset.select_related("seller")
+        if photos:
+            queryset = queryset.prefetch_related(
+                models.Prefetch("photos", queryset=ItemPhoto.objects.order_by("id"))
+            )
+        if reviews:
+            queryset = queryset.prefetch_related(
+                models.Prefetch(
+                    "reviews",
+                    queryset=ItemReview.objects.recent()[:RECENT_REVIEWS_COUNT],
+                    to_attr="recent_reviews"
+                )
+            )
+
+        return queryset
+
+    def update_rating(self, count_delta, sum_delta):
+        """
+        Atomically shift the review aggregates of the items
+        by the given deltas.
+        """
+        review_count = F("review_count") + count_delta
+        rating_sum = F("rating_sum") + sum_delta
+
+        return self.update(
+            review_count=review_count,
+            rating_sum=rating_sum,
+            rating_avg=ratings.rating_avg(rating_sum, review_count),
+        )
+
+    def update_search_vector(self):
+        """
+        Refresh the full-text search vectors of the items.
+        Search vectors are only maintained on PostgreSQL.
+        """
+        if connections[self.db].vendor != "postgresql":
+            return 0
+
+        return self.update(
+            search_vector=(
+                SearchVector("name", weight="A", config=SEARCH_CONFIG)
+                + SearchVector("description", weight="B", config=SEARCH_CONFIG)
+            )
+        )
+
+    def rebuild_ratings(self):
+        """
+        Recompute the review aggregates of the items
+        from their reviews.
+        """
+        return self.update(**ratings.rebuilt_ratings(ItemReview.objects.all()))
+
+
 class Item(models.Model):
     """
     This model represents shop items (products).
@@ -16,17 +95,69 @@ class Item(models.Model):
         decimal_places=2,
         validators=[MinValueValidator(Decimal("0.1"))]
     )
-    available = models.BooleanField(default=True)
+    # Items without a stock count aren't tracked and never run out.
+    stock = models.PositiveIntegerField(null=True, blank=True)
+    available = models.GeneratedField(
+        expression=models.Q(stock__isnull=True) | models.Q(stock__gt=0),
+        output_field=models.BooleanField(),
+        db_persist=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     seller = models.ForeignKey(
         get_user_model(),
         on_delete=models.CASCADE,
         related_name="items"
     )
+    review_count = models.IntegerField(default=0, editable=False)
+    rating_sum = models.IntegerField(default=0, editable=False)
+    rating_avg = models.FloatField(default=0, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ItemQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="shop_item_created_id_idx"),
+            models.Index(fields=["price", "id"], name="shop_item_price_id_idx"),
+            models.Index(fields=["rating_avg", "id"], name="shop_item_rating_id_idx"),
+            models.Index(
+                fields=["seller", "created_at", "id"],
+                name="shop_item_seller_created_idx"
+            ),
+            models.Index(
+                fields=["created_at", "id"],
+                condition=models.Q(available=True),
+                name="shop_item_avail_created_idx"
+            ),
+            models.Index(
+                fields=["price", "id"],
+                condition=models.Q(available=True),
+                name="shop_item_avail_price_idx"
+            ),
+            GinIndex(fields=["search_vector"], name="shop_item_search_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} (${self.price})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"name", "description"} & set(update_fields):
+            Item.objects.using(self._state.db).filter(pk=self.pk).update_search_vector()
+
+    def get_recent_reviews(self):
+        """
+        Return the most recent reviews of the item,
+        using the ones prefetched by with_details() if any.
+        """
+        if hasattr(self, "recent_reviews"):
+            return self.recent_reviews
+
+        return list(self.reviews.recent()[:RECENT_REVIEWS_COUNT])
+
 
 class ItemPhoto(models.Model):
     """
@@ -34,6 +165,51 @@ class ItemPhoto(models.Model):
     """
     item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="photos")
     photo = models.ImageField(upload_to="item_photos/")
+    # Resized copies of the photo, see shop.images.
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+
+
+class ItemReviewQuerySet(models.QuerySet):
+    """
+    Custom queryset for item reviews.
+    """
+    def recent(self):
+        """
+        Order the reviews from newest to oldest
+        and load their authors.
+        """
+        return self.select_related("author").order_by("-created_at", "-id")
+
+    def create_or_update(self, item, author, **fields):
+        """
+        Create the author's review of the item, or update the
+        existing one, and shift the item's review aggregates
+        accordingly. Returns the review and whether it was created.
+
+        Must run in a transaction holding a lock on the item row
+        (see Item.objects.select_for_update()), which serializes
+        reviews of the item, so concurrent requests can neither
+        create duplicates nor lose aggregate updates.
+        """
+        review = self.filter(item=item, author=author).first()
+
+        if review is None:
+            review = self.create(item=item, author=author, **fields)
+            Item.objects.filter(pk=item.pk).update_rating(1, review.rate)
+
+            return review, True
+
+        old_rate = review.rate
+
+        for name, value in fields.items():
+            setattr(review, name, value)
+
+        review.item = item
+        review.author = author
+        review.save(update_fields=list(fields))
+        Item.objects.filter(pk=item.pk).update_rating(0, review.rate - old_rate)
+
+        return review, False
 
 
 class ItemReview(models.Model):
@@ -52,10 +228,45 @@ class ItemReview(models.Model):
         related_name="reviewed"
     )
 
+    objects = ItemReviewQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["item", "created_at"], name="shop_review_item_created_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["item", "author"],
+                name="shop_review_item_author_uniq"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.rate}/10 by {self.author.username}"
 
 
+class StockReservation(models.Model):
+    """
+    This model represents items held for a user. They are
+    taken out of stock until the reservation expires.
+    """
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="reservations")
+    user = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="reservations"
+    )
+    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["expires_at"], name="shop_reservation_expires_idx"),
+            models.Index(fields=["user", "item"], name="shop_reservation_user_item_idx"),
+        ]
+
+
 class Cart(models.Model):
     """
     This model represents user's cart.
@@ -65,4 +276,82 @@ class Cart(models.Model):
         on_delete=models.CASCADE,
         related_name="cart"
     )
-    items = models.ManyToManyField(Item, blank=True)
+    items = models.ManyToManyField(Item, through="CartLine", blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class CartLineQuerySet(models.QuerySet):
+    """
+    Custom queryset for cart lines.
+    """
+    def totals(self):
+        """
+        Return the number of items in the lines and their
+        total price, computed by the database in one query.
+        """
+        return self.aggregate(
+            item_count=Coalesce(Sum("quantity"), 0),
+            subtotal=Coalesce(
+                Sum(F("price") * F("quantity")),
+                Value(Decimal("0")),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+        )
+
+
+class CartLine(models.Model):
+    """
+    This model represents an item in user's cart.
+    """
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="lines")
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="cart_lines")
+    quantity = models.PositiveIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)]
+    )
+    # The item's price when it was added to the cart,
+    # which is what the buyer pays at checkout.
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    objects = CartLineQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["cart", "item"], name="shop_cartline_cart_item_uniq"),
+        ]
+
+
+class Order(models.Model):
+    """
+    This model represents an order placed by checking out a cart.
+    """
+    buyer = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name="orders"
+    )
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["buyer", "created_at"], name="shop_order_buyer_created_idx"),
+        ]
+
+
+class OrderLine(models.Model):
+    """
+    This model represents an item of an order.
+    The item's name and price are copied, so orders
+    stay intact when items change or are deleted.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="lines")
+    item = models.ForeignKey(
+        Item,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="order_lines"
+    )
+    name = models.CharField(max_length=150)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
@@ -0,0 +1,125 @@
+from collections import Counter
+
+from rest_framework.exceptions import ValidationError
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from . import caching, carts
+from .exceptions import Conflict
+from .models import CartLine, Item, Order, OrderLine, StockReservation
+
+
+def checkout(cart):
+    """
+    Turn the cart into an order and empty it.
+
+    The user's reservations of the items are used up, only the
+    quantities beyond them are taken from stock, and reserved items
+    that weren't bought go back to it.
+
+    Must run in a transaction holding a lock on the cart row, which
+    serializes checkouts of the cart. Reservations, then item rows are
+    locked in pk order, like the release of expired reservations does,
+    so concurrent checkouts can't deadlock. The number of statements
+    doesn't depend on the size of the cart: cart lines, reservations,
+    items, order, order lines, stock, reservations deletion, cart lines
+    deletion and cart timestamp.
+    """
+    lines = list(CartLine.objects.filter(cart_id=cart.pk).order_by("item_id"))
+    if not lines:
+        raise ValidationError({"cart": ["The cart is empty."]})
+
+    item_ids = [line.item_id for line in lines]
+
+    # Reservations that expired but weren't released yet
+    # still hold their items, so they are used as well.
+    reservations = list(
+        StockReservation.objects.select_for_update().filter(
+            user_id=cart.owner_id, item_id__in=item_ids
+        ).order_by("pk").values_list("pk", "item_id", "quantity")
+    )
+    reserved = Counter()
+    for _, item_id, quantity in reservations:
+        reserved[item_id] += quantity
+
+    items = Item.objects.select_for_update().filter(
+        pk__in=item_ids
+    ).order_by("pk").only("pk", "name", "stock")
+    items = {item.pk: item for item in items}
+
+    # Items to take from stock, negative for reserved ones to give back.
+    taken = {
+        line.item_id: line.quantity - reserved[line.item_id]
+        for line in lines
+        if line.item_id in items
+    }
+
+    unavailable = [
+        line.item_id for line in lines
+        if line.item_id not in items
+        or not has_stock(items[line.item_id], taken[line.item_id])
+    ]
+    if unavailable:
+        raise Conflict("Some items in the cart are not available.", items=unavailable)
+
+    order = Order.objects.create(
+        buyer_id=cart.owner_id,
+        total=sum(line.price * line.quantity for line in lines),
+    )
+    OrderLine.objects.bulk_create(
+        OrderLine(
+            order=order,
+            item_id=line.item_id,
+            name=items[line.item_id].name,
+            price=line.price,
+            quantity=line.quantity,
+        )
+        for line in lines
+    )
+
+    update_stock(items, taken)
+    if reservations:
+        StockReservation.objects.filter(pk__in=[pk for pk, _, _ in reservations]).delete()
+
+    CartLine.objects.filter(pk__in=[line.pk for line in lines]).delete()
+    carts.touch(cart)
+
+    return order
+
+
+def has_stock(item, quantity):
+    return item.stock is None or item.stock >= quantity
+
+
+def update_stock(items, taken):
+    """
+    Take the given quantities of the locked items from stock
+    in one statement.
+    """
+    taken = {
+        pk: quantity for pk, quantity in taken.items()
+        if quantity and items[pk].stock is not None
+    }
+    if not taken:
+        return
+
+    fields = {
+        "stock": Case(
+            *(When(pk=pk, then=F("stock") - quantity) for pk, quantity in taken.items())
+        )
+    }
+
+    # Items that sell out or are back in stock change availability.
+    changed = [
+        pk for pk, quantity in taken.items()
+        if (items[pk].stock > 0) != (items[pk].stock - quantity > 0)
+    ]
+    if changed:
+        fields["updated_at"] = Case(
+            When(pk__in=changed, then=Value(timezone.now())), default=F("updated_at")
+        )
+
+    Item.objects.filter(pk__in=taken).update(**fields)
+
+    for pk in changed:
+        caching.invalidate_item(pk)
@@ -0,0 +1,28 @@
+from asgiref.sync import sync_to_async
+from rest_framework.pagination import CursorPagination
+
+
+class AsyncCursorPagination(CursorPagination):
+    """
+    Cursor pagination usable from async views.
+    """
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # DRF evaluates the page inside paginate_queryset(), so it's run
+        # in the database thread, the same way the async ORM runs queries.
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+
+class ItemCursorPagination(AsyncCursorPagination):
+    """
+    Cursor (keyset) pagination for the item catalogue.
+    It doesn't count the rows and doesn't use OFFSET,
+    so deep pages cost the same as the first one.
+    """
+    ordering = ("-created_at", "-id")
+
+
+class ReviewCursorPagination(AsyncCursorPagination):
+    """
+    Cursor (keyset) pagination for the reviews of an item.
+    """
+    ordering = ("-created_at", "-id")
@@ -10,7 +10,7 @@ class IsSellerOrReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        return request.user == obj.seller
+        return obj.seller_id == request.user.pk
 
 
 class IsReviewAuthor(permissions.BasePermission):
@@ -19,4 +19,4 @@ class IsReviewAuthor(permissions.BasePermission):
     the user is the author of a review.
     """
     def has_object_permission(self, request, view, obj):
-        return request.user == obj.author
+        return obj.author_id == request.user.pk
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching, tasks
+from .models import Item, ItemPhoto
+
+
+_executor = None
+
+
+def get_executor():
+    """
+    Return the thread pool that writes photos to storage.
+    It is shared between requests, so the number of
+    concurrent storage writes stays bounded.
+    """
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PHOTO_UPLOAD_WORKERS,
+            thread_name_prefix="photo-upload"
+        )
+
+    return _executor
+
+
+def _store(photo, upload):
+    photo.photo.save(upload.name, upload, save=False)
+    return photo
+
+
+def add_photos(item, uploads):
+    """
+    Write the uploaded files to storage concurrently,
+    then insert their rows in a single statement.
+    Stored files are removed again if the insert fails.
+    """
+    if not uploads:
+        return []
+
+    futures = [
+        get_executor().submit(_store, ItemPhoto(item=item), upload)
+        for upload in uploads
+    ]
+
+    photos = []
+    error = None
+    for future in futures:
+        try:
+            photos.append(future.result())
+        except Exception as e:
+            error = error or e
+
+    try:
+        if error is not None:
+            raise error
+
+        with transaction.atomic():
+            photos = ItemPhoto.objects.bulk_create(photos)
+
+            # bulk_create doesn't send post_save.
+            Item.objects.filter(pk=item.pk).update(updated_at=timezone.now())
+    except Exception:
+        for photo in photos:
+            photo.photo.delete(save=False)
+        raise
+
+    caching.invalidate_item(item.pk)
+
+    for photo in photos:
+        tasks.generate_photo_variants.enqueue(photo.pk)
+
+    return photos
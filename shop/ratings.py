@@ -0,0 +1,37 @@
+"""
+Expressions of the review aggregates denormalized on items.
+
+Migrations use them too, so they only take querysets and
+expressions and never import the models.
+"""
+from django.db.models import Count, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def rating_avg(rating_sum, review_count):
+    return Coalesce(
+        Cast(rating_sum, FloatField()) / NullIf(review_count, 0),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def rebuilt_ratings(reviews):
+    """
+    Return the values that recompute the aggregates of items
+    from their reviews, to be passed to QuerySet.update() on
+    items. reviews is a queryset of all item reviews.
+    """
+    reviews = reviews.filter(item=OuterRef("pk")).order_by().values("item")
+    review_count = Coalesce(
+        Subquery(reviews.annotate(count=Count("id")).values("count")), 0
+    )
+    rating_sum = Coalesce(
+        Subquery(reviews.annotate(sum=Sum("rate")).values("sum")), 0
+    )
+
+    return {
+        "review_count": review_count,
+        "rating_sum": rating_sum,
+        "rating_avg": rating_avg(rating_sum, review_count),
+    }
@@ -1,7 +1,35 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
 from . import models
+from .carts import ADD, REMOVE
+from .fieldsets import SparseFieldsetMixin
+from .photos import add_photos
+
+
+class VariantImageField(serializers.ImageField):
+    """
+    Image field that represents the variant chosen with
+    the "img" query parameter, e.g. "?img=thumb".
+    The original is used if there is no such variant.
+    """
+    def __init__(self, variants_field, **kwargs):
+        self.variants_field = variants_field
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        size = request.query_params.get("img") if request is not None else None
+
+        if value and size and size != "source":
+            variants = getattr(value.instance, self.variants_field)
+            if size in variants and variants["source"] == value.name:
+                url = value.storage.url(variants[size]["name"])
+                return request.build_absolute_uri(url)
+
+        return super().to_representation(value)
 
 
 class CompactUserSerializer(serializers.ModelSerializer):
@@ -24,7 +52,7 @@ class CompactItemSerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
-class ItemReviewSerializer(serializers.ModelSerializer):
+class ItemReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     This serializer represents item reviews.
     """
@@ -43,26 +71,62 @@ class ItemPhotoSerializer(serializers.ModelSerializer):
     It is intended to be used as a nested serializer
     in ItemSerializer.
     """
-    
+    photo = VariantImageField(variants_field="variants")
+
     class Meta:
         model = models.ItemPhoto
         fields = ["id", "item", "photo"]
         read_only_fields = ["item"]
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemPhotoUploadSerializer(serializers.Serializer):
+    """
+    This serializer validates a multi-file
+    upload of item photos.
+    """
+    photos = serializers.ListField(
+        child=serializers.ImageField(),
+        allow_empty=False,
+        max_length=settings.PHOTO_UPLOAD_MAX_FILES
+    )
+
+    def create(self, validated_data):
+        return add_photos(validated_data["item"], validated_data["photos"])
+
+
+class ItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     This serializer represents items (products).
     """
     photos = ItemPhotoSerializer(many=True, required=False)
     seller = CompactUserSerializer(read_only=True)
-    reviews = ItemReviewSerializer(read_only=True, many=True)
+    recent_reviews = ItemReviewSerializer(
+        source="get_recent_reviews",
+        read_only=True,
+        many=True
+    )
 
     class Meta:
         model = models.Item
-        fields = ["id", "name", "description", "price",
-                  "available", "created_at", "photos", "seller", "reviews"]
-        read_only_fields = ["created_at"]
+        fields = ["id", "name", "description", "price", "stock", "available", "created_at",
+                  "review_count", "rating_avg", "photos", "seller", "recent_reviews"]
+        read_only_fields = ["available", "created_at", "review_count", "rating_avg"]
+        # The stock changes with every reservation, so only sellers see
+        # it, in their own items, whose responses are never cached.
+        # Others only see whether the item is available.
+        extra_kwargs = {"stock": {"write_only": True}}
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+
+        request = self.context.get("request")
+        if "stock" in self.fields and request is not None and \
+                request.user.is_authenticated and instance.seller_id == request.user.pk:
+            data["stock"] = instance.stock
+            # Keep the declared order.
+            data = {name: data[name] for name in self.fields if name in data}
+
+        return data
 
     def create(self, validated_data):
         if "photos" in validated_data:
@@ -70,11 +134,9 @@ class ItemSerializer(serializers.ModelSerializer):
         else:
             photos = []
 
-        item = models.Item.objects.create(**validated_data)
-
-        
-        for photo in photos:
-            models.ItemPhoto.objects.create(item=item, photo=photo["photo"])
+        with transaction.atomic():
+            item = models.Item.objects.create(**validated_data)
+            add_photos(item, [photo["photo"] for photo in photos])
 
         return item
 
@@ -87,23 +149,136 @@ class ItemSerializer(serializers.ModelSerializer):
         instance.name = validated_data.get("name", instance.name)
         instance.description = validated_data.get("description", instance.description)
         instance.price = validated_data.get("price", instance.price)
-        instance.available = validated_data.get("available", instance.available)
 
-        instance.save()
+        # The stock is only written if it's set, it may
+        # have been changed by reservations since it was read.
+        update_fields = ["name", "description", "price", "updated_at"]
+        if "stock" in validated_data:
+            instance.stock = validated_data["stock"]
+            update_fields.append("stock")
 
-        for photo in photos:
-            models.ItemPhoto.objects.create(item=instance, photo=photo["photo"])
+        with transaction.atomic():
+            instance.save(update_fields=update_fields)
+            add_photos(instance, [photo["photo"] for photo in photos])
 
         return instance
 
 
+class ItemImportSerializer(ItemSerializer):
+    """
+    This serializer validates rows of item imports,
+    with the rules of ItemSerializer for the plain
+    fields. Rows can't have photos.
+    """
+    photos = None
+    seller = None
+    recent_reviews = None
+
+    class Meta(ItemSerializer.Meta):
+        fields = ["name", "description", "price", "stock"]
+
+
+class StockReservationSerializer(serializers.ModelSerializer):
+    """
+    This serializer represents items reserved by a user.
+    """
+    item = CompactItemSerializer(read_only=True)
+
+    class Meta:
+        model = models.StockReservation
+        fields = ["id", "item", "quantity", "created_at", "expires_at"]
+        read_only_fields = ["created_at", "expires_at"]
+
+
+class CartLineSerializer(serializers.ModelSerializer):
+    """
+    This serializer represents an item in user's cart.
+    """
+    item = CompactItemSerializer(read_only=True)
+
+    class Meta:
+        model = models.CartLine
+        fields = ["item", "quantity", "price"]
+        read_only_fields = ["price"]
+
+
 class CartSerializer(serializers.ModelSerializer):
     """
     This serializer represents user's cart.
     """
     owner = CompactUserSerializer(read_only=True)
-    items = CompactItemSerializer(read_only=True, many=True)
+    items = CartLineSerializer(source="lines", read_only=True, many=True)
 
     class Meta:
         model = models.Cart
         fields = ["id", "owner", "items"]
+
+
+class CartOperationSerializer(serializers.Serializer):
+    """
+    This serializer validates one change to user's cart.
+    It is intended to be used in CartUpdateSerializer.
+    """
+    action = serializers.ChoiceField(choices=[ADD, REMOVE])
+    item = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, required=False)
+
+
+class CartUpdateSerializer(serializers.Serializer):
+    """
+    This serializer validates a batch of changes to user's cart.
+    All items are looked up in one query, which also adds their
+    prices to the operations.
+    """
+    operations = CartOperationSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.CART_MAX_OPERATIONS
+    )
+
+    def validate_operations(self, operations):
+        prices = dict(
+            models.Item.objects.filter(
+                pk__in={operation["item"] for operation in operations}
+            ).values_list("pk", "price")
+        )
+
+        errors = [
+            {} if operation["item"] in prices
+            else {"item": [f"Invalid pk \"{operation['item']}\" - object does not exist."]}
+            for operation in operations
+        ]
+        if any(errors):
+            raise serializers.ValidationError(errors)
+
+        return [{**operation, "price": prices[operation["item"]]} for operation in operations]
+
+
+class CartSummarySerializer(serializers.Serializer):
+    """
+    This serializer represents the contents of user's
+    cart with their totals, see CartLineQuerySet.totals().
+    """
+    items = CartLineSerializer(read_only=True, many=True)
+    item_count = serializers.IntegerField(read_only=True)
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+
+class OrderLineSerializer(serializers.ModelSerializer):
+    """
+    This serializer represents an item of an order.
+    """
+    class Meta:
+        model = models.OrderLine
+        fields = ["item", "name", "price", "quantity"]
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    """
+    This serializer represents orders.
+    """
+    lines = OrderLineSerializer(read_only=True, many=True)
+
+    class Meta:
+        model = models.Order
+        fields = ["id", "total", "created_at", "lines"]
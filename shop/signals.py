@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import caching, tasks
+from .models import Item, ItemPhoto, ItemReview, Cart
+
+
+def warm_catalogue():
+    if settings.CACHE_WARMUP_URL:
+        tasks.warm_catalogue.enqueue()
+
+
+def invalidate_carts(carts):
+    for owner_id in carts.values_list("owner_id", flat=True):
+        caching.invalidate_cart(owner_id)
+
+
+@receiver([post_save, post_delete], sender=Item)
+def item_changed(sender, instance, **kwargs):
+    caching.invalidate_item(instance.pk)
+    warm_catalogue()
+
+
+@receiver(post_save, sender=Item)
+def item_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Cart summaries embed item names. New items aren't in any cart yet.
+    if not created and (update_fields is None or "name" in update_fields):
+        invalidate_carts(Cart.objects.filter(items=instance))
+
+
+@receiver(pre_delete, sender=Item)
+def item_deleted(sender, instance, **kwargs):
+    # The item disappears from its seller's profile and from carts.
+    now = timezone.now()
+    get_user_model().objects.filter(pk=instance.seller_id).update(updated_at=now)
+
+    carts = Cart.objects.filter(items=instance)
+    carts.update(updated_at=now)
+    invalidate_carts(carts)
+
+
+@receiver([post_save, post_delete], sender=ItemPhoto)
+@receiver([post_save, post_delete], sender=ItemReview)
+def item_detail_changed(sender, instance, **kwargs):
+    # Photos and reviews are part of the item representation.
+    Item.objects.filter(pk=instance.item_id).update(updated_at=timezone.now())
+    caching.invalidate_item(instance.item_id)
+    warm_catalogue()
+
+
+@receiver(post_save, sender=ItemPhoto)
+def photo_saved(sender, instance, **kwargs):
+    if instance.variants.get("source") != instance.photo.name:
+        tasks.generate_photo_variants.enqueue(instance.pk)
+
+
+@receiver(post_delete, sender=ItemReview)
+def review_deleted(sender, instance, **kwargs):
+    # Also runs for reviews deleted along with their author.
+    Item.objects.filter(pk=instance.item_id).update_rating(-1, -instance.rate)
+    get_user_model().objects.filter(pk=instance.author_id).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver(m2m_changed, sender=Cart.items.through)
+def cart_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ("post_add", "post_remove"):
+        carts = Cart.objects.filter(pk__in=pk_set) if reverse else \
+            Cart.objects.filter(pk=instance.pk)
+    elif action == "pre_clear" and reverse:
+        carts = Cart.objects.filter(items=instance)
+    elif action == "post_clear" and not reverse:
+        carts = Cart.objects.filter(pk=instance.pk)
+    else:
+        return
+
+    carts.update(updated_at=timezone.now())
+    invalidate_carts(carts)
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def user_saving(sender, instance, update_fields=None, **kwargs):
+    # Usernames are embedded in items and reviews, remember
+    # whether it changes. New users aren't embedded anywhere yet.
+    instance._username_changed = not instance._state.adding and (
+        update_fields is None or "username" in update_fields
+    ) and sender.objects.filter(pk=instance.pk).exclude(
+        username=instance.username
+    ).exists()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, created, update_fields=None, **kwargs):
+    caching.invalidate_users()
+
+    if (instance.profile_pic_variants.get("source") or None) != (instance.profile_pic.name or None):
+        tasks.generate_profile_pic_variants.enqueue(instance.pk)
+
+    if not getattr(instance, "_username_changed", False):
+        return
+
+    Item.objects.filter(
+        Q(seller=instance) | Q(reviews__author=instance)
+    ).update(updated_at=timezone.now())
+    caching.invalidate_all()
+    warm_catalogue()
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleted(sender, instance, **kwargs):
+    caching.invalidate_users()
@@ -0,0 +1,78 @@
+"""
+Background jobs of the shop, run by "manage.py runworker".
+"""
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import reverse
+
+from jobs.base import job
+from . import images
+from .models import Item
+
+
+@job(key=lambda pk: f"shop:photo-variants:{pk}")
+def generate_photo_variants(pk):
+    images.generate_photo_variants(pk)
+
+
+@job(key=lambda pk: f"shop:profile-pic-variants:{pk}")
+def generate_profile_pic_variants(pk):
+    images.generate_profile_pic_variants(pk)
+
+
+@job
+def rebuild_item_ratings(item_ids):
+    Item.objects.filter(pk__in=item_ids).rebuild_ratings()
+
+
+@job(key=lambda: "shop:warm-catalogue", delay=5)
+def warm_catalogue():
+    """
+    Cache the first page of the item list and the items
+    on it, as anonymous visitors would request them.
+    Cache keys include the request URL, so this needs
+    CACHE_WARMUP_URL to be the public URL of the API.
+    The delay coalesces bursts of changes.
+    """
+    # The views depend on this module through the serializers.
+    from .views import ListCreateItemView, RetrieveUpdateItemView
+
+    if not settings.CACHE_WARMUP_URL:
+        return
+
+    url = urlsplit(settings.CACHE_WARMUP_URL)
+    factory = RequestFactory(HTTP_HOST=url.netloc)
+    secure = url.scheme == "https"
+
+    list_view = async_to_sync(ListCreateItemView.as_view())
+    item_view = async_to_sync(RetrieveUpdateItemView.as_view())
+
+    response = list_view(factory.get(reverse("shop:list_items"), secure=secure))
+
+    for item in response.data["results"]:
+        item_view(
+            factory.get(
+                reverse("shop:retrieve_item", kwargs={"pk": item["id"]}),
+                secure=secure
+            ),
+            pk=item["id"]
+        )
+
+
+@job(key=lambda: "shop:release-reservations")
+def release_expired_reservations():
+    """
+    Put the stock of expired reservations back, then run
+    again when the next reservation expires.
+    """
+    # The inventory module queues this job.
+    from . import inventory
+
+    inventory.release_expired()
+
+    expires_at = inventory.next_expiry()
+    if expires_at is not None:
+        release_expired_reservations.enqueue_at(expires_at)
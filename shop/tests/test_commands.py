@@ -0,0 +1,174 @@
+import tempfile
+from io import StringIO
+from datetime import timedelta
+from decimal import Decimal
+from django.core.files import File
+from django.core.management import call_command, CommandError
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from .common import create_testing_image
+from shop import models, images
+
+
+class RebuildItemRatingsTests(TestCase):
+    def test_rebuild_item_ratings(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        unreviewed_item = models.Item.objects.create(
+            name="Another Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+            review_count=3,
+            rating_sum=15,
+            rating_avg=5,
+        )
+
+        for i, rate in enumerate((3, 4, 8)):
+            testing_reviewer = get_user_model().objects.create_user(
+                username=f"testing_reviewer{i}",
+                password="dws9uirj"
+            )
+
+            models.ItemReview.objects.create(
+                rate=rate,
+                item=item,
+                author=testing_reviewer
+            )
+
+        out = StringIO()
+        call_command("rebuild_item_ratings", stdout=out)
+
+        item.refresh_from_db()
+        unreviewed_item.refresh_from_db()
+
+        self.assertIn("2 items", out.getvalue())
+        self.assertEqual(item.review_count, 3)
+        self.assertEqual(item.rating_sum, 15)
+        self.assertEqual(item.rating_avg, 5)
+        self.assertEqual(unreviewed_item.review_count, 0)
+        self.assertEqual(unreviewed_item.rating_sum, 0)
+        self.assertEqual(unreviewed_item.rating_avg, 0)
+
+
+class ReleaseExpiredReservationsTests(TestCase):
+    def test_release_expired_reservations(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            stock=0,
+            seller=testing_seller,
+        )
+
+        for minutes in (-1, -1, 5):
+            models.StockReservation.objects.create(
+                item=item,
+                user=testing_seller,
+                quantity=2,
+                expires_at=timezone.now() + timedelta(minutes=minutes)
+            )
+
+        out = StringIO()
+        call_command("release_expired_reservations", stdout=out)
+
+        item.refresh_from_db()
+
+        self.assertIn("2 reservations", out.getvalue())
+        self.assertEqual(item.stock, 4)
+        self.assertTrue(item.available)
+        self.assertEqual(models.StockReservation.objects.count(), 1)
+
+
+class ImportItemsTests(TestCase):
+    def test_import_items(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        with tempfile.NamedTemporaryFile(suffix=".csv") as file:
+            file.write(
+                b"name,description,price,stock\n"
+                b"Test Item 1,This is a test item.,5.7,10\n"
+                b"Test Item 2,This is a test item.,-1,\n"
+            )
+            file.flush()
+
+            out, err = StringIO(), StringIO()
+            call_command(
+                "import_items", file.name, seller="testing_seller", stdout=out, stderr=err
+            )
+
+        item = models.Item.objects.get()
+
+        self.assertIn("Created 1 items", out.getvalue())
+        self.assertIn("Row 2", err.getvalue())
+        self.assertEqual(item.name, "Test Item 1")
+        self.assertEqual(item.stock, 10)
+        self.assertEqual(item.seller, testing_seller)
+
+    def test_import_items_unknown_seller(self):
+        with self.assertRaises(CommandError):
+            call_command("import_items", "items.csv", seller="nobody")
+
+
+class GenerateImageVariantsTests(TestCase):
+    def test_generate_image_variants(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj",
+            profile_pic=File(create_testing_image())
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        photo = models.ItemPhoto.objects.create(
+            item=item,
+            photo=File(create_testing_image())
+        )
+
+        out = StringIO()
+        call_command("generate_image_variants", stdout=out)
+
+        self.assertIn("Generated variants of 2 images.", out.getvalue())
+
+        out = StringIO()
+        call_command("generate_image_variants", stdout=out)
+
+        self.assertIn("Generated variants of 0 images.", out.getvalue())
+
+        photo.refresh_from_db()
+        testing_seller.refresh_from_db()
+
+        for file, variants in ((photo.photo, photo.variants),
+                               (testing_seller.profile_pic,
+                                testing_seller.profile_pic_variants)):
+            self.assertEqual(variants["source"], file.name)
+            self.assertEqual(variants["thumb"]["width"], 50)
+            self.assertTrue(file.storage.exists(variants["thumb"]["name"]))
+
+            images.delete_variants(file.storage, variants)
+            file.delete()
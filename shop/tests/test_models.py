@@ -92,6 +92,53 @@ class ItemReviewModelTests(TestCase):
         self.assertEqual(review.item, testing_item)
         self.assertEqual(review.author, testing_reviewer)
 
+    def test_create_or_update_review(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        testing_reviewer = get_user_model().objects.create_user(
+            username="testing_reviewer",
+            password="dws9uirj"
+        )
+
+        testing_item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        review, created = models.ItemReview.objects.create_or_update(
+            testing_item, testing_reviewer, rate=9
+        )
+
+        self.assertTrue(created)
+
+        review, created = models.ItemReview.objects.create_or_update(
+            testing_item, testing_reviewer, rate=3
+        )
+
+        self.assertFalse(created)
+        self.assertEqual(models.ItemReview.objects.get().rate, 3)
+
+        testing_item.refresh_from_db()
+
+        self.assertEqual(
+            (testing_item.review_count, testing_item.rating_sum, testing_item.rating_avg),
+            (1, 3, 3.0)
+        )
+
+        # Reviews deleted along with their author.
+        testing_reviewer.delete()
+        testing_item.refresh_from_db()
+
+        self.assertEqual(
+            (testing_item.review_count, testing_item.rating_sum, testing_item.rating_avg),
+            (0, 0, 0.0)
+        )
+
 
 class CartModelTests(TestCase):
     def test_cart_add_items(self):
@@ -120,8 +167,8 @@ class CartModelTests(TestCase):
         )
 
         cart = models.Cart.objects.create(owner=testing_user)
-        cart.items.add(testing_item1)
-        cart.items.add(testing_item2)
+        cart.items.add(testing_item1, through_defaults={"price": testing_item1.price})
+        cart.items.add(testing_item2, through_defaults={"price": testing_item2.price})
 
         self.assertIn(testing_item1, cart.items.all())
         self.assertIn(testing_item2, cart.items.all())
@@ -93,7 +93,7 @@ class ItemSerializerTests(TestCase):
             "name": "Updated Test Item",
             "description": "This test item was updated.",
             "price": "6.7",
-            "available": False,
+            "stock": 0,
             "photos": [
                 {"photo": File(testing_image)}
             ]
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from jobs.models import Job
+from shop import models, tasks
+
+
+class WarmCatalogueTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(CACHE_WARMUP_URL="http://testserver")
+    def test_warm_catalogue(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        self.assertTrue(Job.objects.filter(name="shop.tasks.warm_catalogue").exists())
+
+        tasks.warm_catalogue()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("shop:list_items"), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["name"], item.name)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse("shop:retrieve_item", kwargs={"pk": item.id}),
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], item.name)
+
+
+class ReleaseExpiredReservationsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_release_expired_reservations(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        sold_out_item, item = models.Item.objects.bulk_create(
+            models.Item(
+                name=f"Test Item {i}",
+                description="This is a test item.",
+                price=Decimal("5.7"),
+                stock=stock,
+                seller=testing_seller,
+            ) for i, stock in enumerate((0, 2))
+        )
+
+        now = timezone.now()
+        expired = models.StockReservation.objects.bulk_create(
+            models.StockReservation(
+                item=reserved_item,
+                user=testing_seller,
+                quantity=quantity,
+                expires_at=now - timedelta(seconds=1)
+            ) for reserved_item, quantity in ((sold_out_item, 2), (sold_out_item, 1), (item, 1))
+        )
+        active = models.StockReservation.objects.create(
+            item=item,
+            user=testing_seller,
+            quantity=1,
+            expires_at=now + timedelta(minutes=5)
+        )
+
+        url = reverse("shop:retrieve_item", kwargs={"pk": sold_out_item.id})
+        self.assertFalse(self.client.get(url, format="json").data["available"])
+
+        tasks.release_expired_reservations()
+
+        sold_out_item.refresh_from_db()
+        item.refresh_from_db()
+
+        self.assertEqual(sold_out_item.stock, 3)
+        self.assertEqual(item.stock, 3)
+        self.assertTrue(self.client.get(url, format="json").data["available"])
+        self.assertFalse(
+            models.StockReservation.objects.filter(pk__in=[r.pk for r in expired]).exists()
+        )
+        self.assertEqual(
+            Job.objects.get(name="shop.tasks.release_expired_reservations").run_after,
+            active.expires_at
+        )
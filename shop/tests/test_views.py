@@ -1,10 +1,22 @@
+import json
+import threading
 from decimal import Decimal
+from asgiref.sync import sync_to_async
 from django.urls import reverse
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
 from django.contrib.auth import get_user_model
-from rest_framework.test import APITestCase
-from rest_framework import status
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework import generics, status
 
-from shop import views, models, serializers
+from shop import models, images, bulk
+from shop.async_views import AsyncReadMixin
+from .common import create_testing_image
 
 
 class ListCreateItemTests(APITestCase):
@@ -40,6 +52,151 @@ class ListCreateItemTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["results"]), 3)
 
+    def test_list_items_query_count(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        testing_reviewers = [
+            get_user_model().objects.create_user(
+                username=f"testing_reviewer{i}",
+                password="dws9uirj"
+            )
+            for i in range(4)
+        ]
+
+        for i in range(5):
+            item = models.Item.objects.create(
+                name=f"Test Item {i}",
+                description="This is a test item.",
+                price=Decimal("5.7"),
+                seller=testing_seller,
+            )
+
+            for reviewer in testing_reviewers:
+                models.ItemReview.objects.create(
+                    rate=7,
+                    text="This is a test review.",
+                    item=item,
+                    author=reviewer
+                )
+
+        # items with sellers, photos, reviews with authors
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("shop:list_items"), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 5)
+        self.assertEqual(len(response.data["results"][0]["recent_reviews"]), 3)
+
+    def test_list_items_sparse_fieldset(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        for i in range(15):
+            models.Item.objects.create(
+                name=f"Test Item {i}",
+                description="This is a test item.",
+                price=Decimal(i + 1),
+                seller=testing_seller,
+            )
+
+        ids = []
+        url = reverse("shop:list_items") + "?fields=id,name,price&expand=seller&ordering=price"
+
+        while url:
+            # items with sellers, nothing deferred is loaded later
+            with self.assertNumQueries(1):
+                response = self.client.get(url, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                list(response.data["results"][0]),
+                ["id", "name", "price", "seller"]
+            )
+
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(
+            ids,
+            list(models.Item.objects.order_by("price", "id").values_list("id", flat=True))
+        )
+
+    def test_list_items_fields_without_expand(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        # Nested objects that aren't named are neither loaded nor returned.
+        for fields, expected, queries in (
+            ("id,name", ["id", "name"], 1),
+            ("id,seller", ["id", "seller"], 1),
+            ("id,photos", ["id", "photos"], 2),
+        ):
+            with self.assertNumQueries(queries):
+                response = self.client.get(
+                    reverse("shop:list_items"),
+                    data={"fields": fields},
+                    format="json"
+                )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(list(response.data["results"][0]), expected)
+
+    def test_list_items_unknown_field(self):
+        response = self.client.get(
+            reverse("shop:list_items"),
+            data={"fields": "id,secret", "expand": "seller"},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", response.data)
+
+    def test_list_items_pagination(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        for i in range(25):
+            models.Item.objects.create(
+                name=f"Test Item {i}",
+                description="This is a test item.",
+                price=Decimal("5.7"),
+                seller=testing_seller,
+            )
+
+        expected_ids = list(
+            models.Item.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+        ids = []
+        url = reverse("shop:list_items")
+
+        while url:
+            response = self.client.get(url, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+
+            ids += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+
+        self.assertEqual(ids, expected_ids)
+
     def test_create_item(self):
         testing_seller = get_user_model().objects.create_user(
             username="testing_seller",
@@ -69,6 +226,133 @@ class ListCreateItemTests(APITestCase):
         self.assertEqual(response.data["seller"]["username"], testing_seller.username)
 
 
+class SearchItemTests(APITestCase):
+    def setUp(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        self.phone = models.Item.objects.create(
+            name="Red Phone",
+            description="A phone with a large screen.",
+            price=Decimal("120"),
+            seller=testing_seller,
+        )
+
+        self.case = models.Item.objects.create(
+            name="Leather Case",
+            description="A case that fits any phone.",
+            price=Decimal("15"),
+            seller=testing_seller,
+        )
+
+        models.Item.objects.create(
+            name="Wooden Chair",
+            description="A sturdy chair.",
+            price=Decimal("40"),
+            seller=testing_seller,
+        )
+
+    def search(self, q):
+        response = self.client.get(reverse("shop:list_items"), {"q": q}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        return [item["id"] for item in response.data["results"]]
+
+    def test_search_items(self):
+        self.assertEqual(set(self.search("phone")), {self.phone.id, self.case.id})
+        self.assertEqual(self.search("leather"), [self.case.id])
+        self.assertEqual(self.search("red phone"), [self.phone.id])
+        self.assertEqual(self.search("desk"), [])
+
+    def test_search_updated_item(self):
+        self.case.name = "Leather Desk Cover"
+        self.case.save()
+
+        self.assertEqual(self.search("desk"), [self.case.id])
+
+
+class FilterItemTests(APITestCase):
+    def setUp(self):
+        self.testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        self.another_seller = get_user_model().objects.create_user(
+            username="another_seller",
+            password="dws9uirj"
+        )
+
+        for i in range(12):
+            models.Item.objects.create(
+                name=f"Test Item {i}",
+                description="This is a test item.",
+                price=Decimal(10 + i % 4 * 10),
+                stock=1 if i % 3 else 0,
+                seller=self.testing_seller if i % 2 else self.another_seller,
+            )
+
+    def list_items(self, params):
+        ids = []
+        url = reverse("shop:list_items")
+
+        while url:
+            response = self.client.get(url, params, format="json")
+            params = None
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            ids += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+
+        return ids
+
+    def test_filter_items(self):
+        ids = self.list_items({
+            "price_min": "20",
+            "price_max": "30",
+            "available": "true",
+            "seller": self.testing_seller.id,
+        })
+
+        expected_ids = models.Item.objects.filter(
+            price__gte=20,
+            price__lte=30,
+            available=True,
+            seller=self.testing_seller
+        ).order_by("-created_at", "-id").values_list("id", flat=True)
+
+        self.assertNotEqual(ids, [])
+        self.assertEqual(ids, list(expected_ids))
+
+    def test_order_items(self):
+        for ordering in ("price", "-price", "created_at", "-rating_avg"):
+            ids = self.list_items({"ordering": ordering})
+
+            tie_breaker = "-id" if ordering.startswith("-") else "id"
+            expected_ids = models.Item.objects.order_by(
+                ordering, tie_breaker
+            ).values_list("id", flat=True)
+
+            self.assertEqual(ids, list(expected_ids))
+
+    def test_invalid_filter(self):
+        for param, value in (("price_min", "cheap"), ("price_min", "nan"),
+                             ("price_max", "-Infinity"), ("seller", "x"),
+                             ("seller", "99999999999999999999")):
+            response = self.client.get(
+                reverse("shop:list_items"),
+                {param: value},
+                format="json"
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(param, response.data)
+
+
 class RetrieveUpdateItemTests(APITestCase):
     def test_retrieve_item(self):
         testing_seller = get_user_model().objects.create_user(
@@ -94,6 +378,74 @@ class RetrieveUpdateItemTests(APITestCase):
         self.assertEqual(Decimal(response.data["price"]), item.price)
         self.assertEqual(response.data["seller"]["username"], testing_seller.username)
 
+    def test_retrieve_item_query_count(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        reviews = []
+
+        for i in range(4):
+            testing_reviewer = get_user_model().objects.create_user(
+                username=f"testing_reviewer{i}",
+                password="dws9uirj"
+            )
+
+            reviews.append(models.ItemReview.objects.create(
+                rate=7,
+                text="This is a test review.",
+                item=item,
+                author=testing_reviewer
+            ))
+
+        # validators, item with seller, photos, recent reviews with authors
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                reverse("shop:retrieve_item", kwargs={"pk": item.id}),
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [review["id"] for review in response.data["recent_reviews"]],
+            [review.id for review in reversed(reviews[1:])]
+        )
+
+    def test_retrieve_item_sparse_fieldset(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        # validators, item
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("shop:retrieve_item", kwargs={"pk": item.id}),
+                data={"expand": ""},
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("seller", response.data)
+        self.assertNotIn("photos", response.data)
+        self.assertNotIn("recent_reviews", response.data)
+        self.assertEqual(response.data["description"], item.description)
+
     def test_update_item(self):
         testing_seller = get_user_model().objects.create_user(
             username="testing_seller",
@@ -157,181 +509,1743 @@ class RetrieveUpdateItemTests(APITestCase):
         self.assertEqual(models.Item.objects.count(), 0)
 
 
-class CreateReviewTests(APITestCase):
-    def test_create_review(self):
-        testing_reviewer = get_user_model().objects.create_user(
-            username="testing_reviewer",
+class CachedItemTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
             password="dws9uirj"
         )
 
-        item = models.Item.objects.create(
+        self.item = models.Item.objects.create(
             name="Test Item",
             description="This is a test item.",
             price=Decimal("5.7"),
-            seller=testing_reviewer,
+            seller=self.testing_seller,
         )
 
-        review_data = {
-            "rate": 7,
-            "text": "This is a test review."
-        }
+    def test_cached_item_list(self):
+        self.client.get(reverse("shop:list_items"), format="json")
 
-        self.client.force_authenticate(user=testing_reviewer)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("shop:list_items"), format="json")
 
-        response = self.client.post(
-            reverse("shop:create_review", kwargs={"pk": item.id}),
-            data=review_data,
-            format="json"
-        )
-        
-        self.client.force_authenticate(user=None)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["name"], self.item.name)
 
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(response.data["rate"], review_data["rate"])
-        self.assertEqual(response.data["text"], review_data["text"])
-        self.assertEqual(response.data["author"]["username"], testing_reviewer.username)
+        self.item.name = "Updated Test Item"
+        self.item.save()
 
+        response = self.client.get(reverse("shop:list_items"), format="json")
 
-class UpdateDestroyReviewTests(APITestCase):
-    def test_update_review(self):
-        testing_reviewer = get_user_model().objects.create_user(
-            username="testing_reviewer",
-            password="dws9uirj"
-        )
+        self.assertEqual(response.data["results"][0]["name"], self.item.name)
 
-        item = models.Item.objects.create(
-            name="Test Item",
-            description="This is a test item.",
-            price=Decimal("5.7"),
-            seller=testing_reviewer,
-        )
+    def test_cached_item(self):
+        url = reverse("shop:retrieve_item", kwargs={"pk": self.item.id})
 
-        review = models.ItemReview.objects.create(
+        self.client.get(url, format="json")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["recent_reviews"], [])
+
+        models.ItemReview.objects.create(
             rate=7,
             text="This is a test review.",
-            item=item,
-            author=testing_reviewer
+            item=self.item,
+            author=self.testing_seller
         )
 
-        review_data = {
-            "rate": 5,
-            "text": "This is an updated review."
-        }
+        response = self.client.get(url, format="json")
 
-        self.client.force_authenticate(user=testing_reviewer)
+        self.assertEqual(len(response.data["recent_reviews"]), 1)
 
-        response = self.client.put(
-            reverse("shop:update_review", kwargs={"pk": item.id, "r_pk": review.id}),
-            data=review_data,
-            format="json"
-        )
-        
-        self.client.force_authenticate(user=None)
-        
-        review = models.ItemReview.objects.get()
+        self.testing_seller.username = "renamed_seller"
+        self.testing_seller.save()
 
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(review.rate, review_data["rate"])
-        self.assertEqual(review.text, review_data["text"])
-        self.assertEqual(review.author, testing_reviewer)
-        self.assertEqual(review.item, item)
+        response = self.client.get(url, format="json")
 
-    def test_delete_review(self):
-        testing_reviewer = get_user_model().objects.create_user(
-            username="testing_reviewer",
-            password="dws9uirj"
-        )
+        self.assertEqual(response.data["seller"]["username"], "renamed_seller")
 
-        item = models.Item.objects.create(
-            name="Test Item",
-            description="This is a test item.",
-            price=Decimal("5.7"),
-            seller=testing_reviewer,
-        )
+    def test_cached_item_kept_on_profile_change(self):
+        url = reverse("shop:retrieve_item", kwargs={"pk": self.item.id})
+        self.client.get(url, format="json")
 
-        review = models.ItemReview.objects.create(
-            rate=7,
-            text="This is a test review.",
-            item=item,
-            author=testing_reviewer
-        )
+        self.testing_seller.bio = "This is a test bio."
+        self.testing_seller.save()
 
-        self.client.force_authenticate(user=testing_reviewer)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_authenticated_item_not_cached(self):
+        url = reverse("shop:retrieve_item", kwargs={"pk": self.item.id})
+
+        self.client.force_authenticate(user=self.testing_seller)
+        self.client.get(url, format="json")
+
+        # validators, item with seller, photos, recent reviews with authors
+        with self.assertNumQueries(4):
+            response = self.client.get(url, format="json")
 
-        response = self.client.delete(
-            reverse("shop:update_review", kwargs={"pk": item.id, "r_pk": review.id}),
-            format="json"
-        )
-        
         self.client.force_authenticate(user=None)
 
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(models.ItemReview.objects.count(), 0)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
 
-class ManageCartTests(APITestCase):
-    def test_cart_add_item(self):
-        testing_seller = get_user_model().objects.create_user(
-            username="testing_seller",
-            password="dws9uirj"
-        )
+class ConditionalItemTests(APITestCase):
+    def setUp(self):
+        cache.clear()
 
-        testing_buyer = get_user_model().objects.create_user(
-            username="testing_buyer",
+        self.testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
             password="dws9uirj"
         )
 
-        models.Cart.objects.create(owner=testing_buyer)
-
-        item = models.Item.objects.create(
+        self.item = models.Item.objects.create(
             name="Test Item",
             description="This is a test item.",
             price=Decimal("5.7"),
-            seller=testing_seller,
+            seller=self.testing_seller,
         )
 
-        self.client.force_authenticate(user=testing_buyer)
+    def test_item_not_modified(self):
+        url = reverse("shop:retrieve_item", kwargs={"pk": self.item.id})
 
-        response = self.client.post(
-            reverse("shop:manage_cart", kwargs={"pk": item.id}),
-            format="json"
-        )
-        
-        self.client.force_authenticate(user=None)
+        response = self.client.get(url, format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn(item, testing_buyer.cart.items.all())
+        self.assertIn("ETag", response.headers)
+        self.assertIn("Last-Modified", response.headers)
 
-    def test_cart_remove_item(self):
-        testing_seller = get_user_model().objects.create_user(
-            username="testing_seller",
-            password="dws9uirj"
-        )
-        
-        item = models.Item.objects.create(
-            name="Test Item",
-            description="This is a test item.",
-            price=Decimal("5.7"),
-            seller=testing_seller,
-        )
+        etag = response.headers["ETag"]
 
-        testing_buyer = get_user_model().objects.create_user(
-            username="testing_buyer",
+        # Sellers see the stock, their items have other validators.
+        testing_user = get_user_model().objects.create_user(
+            username="testing_user",
             password="dws9uirj"
         )
+        self.client.force_authenticate(user=testing_user)
 
-        models.Cart.objects.create(owner=testing_buyer)
-        testing_buyer.cart.items.add(item)
+        # validators only
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
 
-        self.client.force_authenticate(user=testing_buyer)
+        self.client.force_authenticate(user=None)
 
-        response = self.client.delete(
-            reverse("shop:manage_cart", kwargs={"pk": item.id}),
-            format="json"
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.headers["ETag"], etag)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        models.ItemReview.objects.create(
+            rate=7,
+            text="This is a test review.",
+            item=self.item,
+            author=self.testing_seller
         )
-        
-        self.client.force_authenticate(user=None)
+
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_item_if_match(self):
+        url = reverse("shop:retrieve_item", kwargs={"pk": self.item.id})
+
+        self.client.force_authenticate(user=self.testing_seller)
+
+        etag = self.client.get(url, format="json").headers["ETag"]
+
+        item_data = {
+            "name": "Updated Test Item",
+            "description": "This is an updated test item.",
+            "price": "11.6"
+        }
+
+        response = self.client.put(url, data=item_data, format="json", HTTP_IF_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+        response = self.client.patch(
+            url,
+            data={"name": "Conflicting Test Item"},
+            format="json",
+            HTTP_IF_MATCH=etag
+        )
+
+        self.client.force_authenticate(user=None)
+
+        self.item.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(self.item.name, item_data["name"])
+
+    def test_item_list_not_modified(self):
+        response = self.client.get(reverse("shop:list_items"), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response.headers)
+
+        etag = response.headers["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse("shop:list_items"),
+                format="json",
+                HTTP_IF_NONE_MATCH=etag
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.item.delete()
+
+        response = self.client.get(
+            reverse("shop:list_items"),
+            format="json",
+            HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [])
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentConditionalUpdateTests(TransactionTestCase):
+    """
+    Updates of one item with the same If-Match made
+    at the same time from separate connections.
+    """
+    def test_concurrent_if_match(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        url = reverse("shop:retrieve_item", kwargs={"pk": item.id})
+        client = APIClient()
+        client.force_authenticate(user=testing_seller)
+        etag = client.get(url, format="json").headers["ETag"]
+
+        names = ["First Test Item", "Second Test Item"]
+        barrier = threading.Barrier(len(names))
+        codes = []
+
+        def update(name):
+            client = APIClient()
+            client.force_authenticate(user=testing_seller)
+            barrier.wait()
+
+            try:
+                response = client.patch(
+                    url,
+                    data={"name": name},
+                    format="json",
+                    HTTP_IF_MATCH=etag
+                )
+                codes.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=update, args=(name,)) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            sorted(codes),
+            [status.HTTP_200_OK, status.HTTP_412_PRECONDITION_FAILED]
+        )
+
+
+class AsyncReadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        self.item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=self.testing_seller,
+        )
+
+        models.ItemReview.objects.create(
+            rate=7,
+            text="This is a test review.",
+            item=self.item,
+            author=self.testing_seller
+        )
+
+    async def test_async_reads(self):
+        token = await sync_to_async(AccessToken.for_user)(self.testing_seller)
+
+        for headers in ({}, {"Authorization": f"Bearer {token}"}):
+            response = await self.async_client.get(reverse("shop:list_items"), headers=headers)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()["results"][0]["name"], self.item.name)
+
+            response = await self.async_client.get(
+                reverse("shop:retrieve_item", kwargs={"pk": self.item.id}),
+                headers=headers
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()["recent_reviews"][0]["rate"], 7)
+
+            response = await self.async_client.get(
+                reverse("shop:list_reviews", kwargs={"pk": self.item.id}),
+                headers=headers
+            )
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json()["results"][0]["rate"], 7)
+
+        response = await self.async_client.get(
+            reverse("shop:retrieve_item", kwargs={"pk": 0})
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = await self.async_client.get(
+            reverse("shop:list_items"),
+            headers={"Authorization": "Bearer invalid"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_async_read_view_without_aget(self):
+        with self.assertRaises(ImproperlyConfigured):
+            class ItemView(AsyncReadMixin, generics.ListAPIView):
+                pass
+
+
+class UploadItemPhotosTests(APITestCase):
+    def setUp(self):
+        self.testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        self.item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=self.testing_seller,
+        )
+
+        self.url = reverse("shop:upload_photos", kwargs={"pk": self.item.id})
+
+    def test_upload_photos(self):
+        self.client.force_authenticate(user=self.testing_seller)
+
+        response = self.client.post(
+            self.url,
+            data={"photos": [create_testing_image() for _ in range(3)]},
+            format="multipart"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(self.item.photos.count(), 3)
+
+        for photo in self.item.photos.all():
+            self.assertTrue(photo.photo.storage.exists(photo.photo.name))
+            photo.photo.delete()
+
+    def test_photo_variants(self):
+        testing_image = create_testing_image(size=(1000, 500))
+        photo = models.ItemPhoto.objects.create(item=self.item, photo=File(testing_image))
+
+        images.generate_photo_variants(photo.id)
+        photo.refresh_from_db()
+
+        self.assertEqual(photo.variants["source"], photo.photo.name)
+        self.assertEqual(photo.variants["thumb"]["width"], 320)
+        self.assertEqual(photo.variants["thumb"]["height"], 160)
+        self.assertEqual(photo.variants["large"]["width"], 1000)
+
+        url = reverse("shop:retrieve_item", kwargs={"pk": self.item.id})
+
+        response = self.client.get(url, {"img": "thumb"}, format="json")
+        thumb = photo.photo.storage.url(photo.variants["thumb"]["name"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["photos"][0]["photo"].endswith(thumb))
+
+        response = self.client.get(url, {"img": "unknown"}, format="json")
+
+        self.assertTrue(response.data["photos"][0]["photo"].endswith(photo.photo.url))
+
+        images.delete_variants(photo.photo.storage, photo.variants)
+        photo.photo.delete()
+
+    def test_upload_invalid_photos(self):
+        invalid_file = create_testing_image()
+        invalid_file.write(b"not an image")
+        invalid_file.seek(0)
+        invalid_file.truncate(4)
+
+        self.client.force_authenticate(user=self.testing_seller)
+
+        response = self.client.post(
+            self.url,
+            data={"photos": [invalid_file]},
+            format="multipart"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.item.photos.count(), 0)
+
+    def test_upload_photos_forbidden(self):
+        testing_user = get_user_model().objects.create_user(
+            username="testing_user",
+            password="dws9uirj"
+        )
+
+        self.client.force_authenticate(user=testing_user)
+
+        response = self.client.post(
+            self.url,
+            data={"photos": [create_testing_image()]},
+            format="multipart"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.item.photos.count(), 0)
+
+
+class ListReviewTests(APITestCase):
+    def test_list_reviews(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        another_item = models.Item.objects.create(
+            name="Another Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        for i in range(15):
+            testing_reviewer = get_user_model().objects.create_user(
+                username=f"testing_reviewer{i}",
+                password="dws9uirj"
+            )
+
+            models.ItemReview.objects.create(
+                rate=7,
+                text="This is a test review.",
+                item=item,
+                author=testing_reviewer
+            )
+
+        models.ItemReview.objects.create(
+            rate=7,
+            text="This is a test review.",
+            item=another_item,
+            author=testing_seller
+        )
+
+        expected_ids = list(
+            item.reviews.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+        ids = []
+        url = reverse("shop:list_reviews", kwargs={"pk": item.id})
+
+        while url:
+            response = self.client.get(url, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+            ids += [review["id"] for review in response.data["results"]]
+            url = response.data["next"]
+
+        self.assertEqual(ids, expected_ids)
+
+    def test_list_reviews_missing_item(self):
+        response = self.client.get(
+            reverse("shop:list_reviews", kwargs={"pk": 1}),
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CreateReviewTests(APITestCase):
+    def test_create_review(self):
+        testing_reviewer = get_user_model().objects.create_user(
+            username="testing_reviewer",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_reviewer,
+        )
+
+        review_data = {
+            "rate": 7,
+            "text": "This is a test review."
+        }
+
+        self.client.force_authenticate(user=testing_reviewer)
+
+        response = self.client.post(
+            reverse("shop:create_review", kwargs={"pk": item.id}),
+            data=review_data,
+            format="json"
+        )
+        
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["rate"], review_data["rate"])
+        self.assertEqual(response.data["text"], review_data["text"])
+        self.assertEqual(response.data["author"]["username"], testing_reviewer.username)
+
+        item.refresh_from_db()
+
+        self.assertEqual(item.review_count, 1)
+        self.assertEqual(item.rating_sum, review_data["rate"])
+        self.assertEqual(item.rating_avg, review_data["rate"])
+
+    def test_create_review_again(self):
+        testing_reviewer = get_user_model().objects.create_user(
+            username="testing_reviewer",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_reviewer,
+        )
+
+        self.client.force_authenticate(user=testing_reviewer)
+
+        first = self.client.post(
+            reverse("shop:create_review", kwargs={"pk": item.id}),
+            data={"rate": 7, "text": "This is a test review."},
+            format="json"
+        )
+        second = self.client.post(
+            reverse("shop:create_review", kwargs={"pk": item.id}),
+            data={"rate": 3, "text": "This is an updated review."},
+            format="json"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        item.refresh_from_db()
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data["id"], first.data["id"])
+        self.assertEqual(second.data["text"], "This is an updated review.")
+        self.assertEqual(models.ItemReview.objects.count(), 1)
+        self.assertEqual(item.review_count, 1)
+        self.assertEqual(item.rating_sum, 3)
+        self.assertEqual(item.rating_avg, 3)
+
+    def test_create_review_not_found(self):
+        testing_reviewer = get_user_model().objects.create_user(
+            username="testing_reviewer",
+            password="dws9uirj"
+        )
+
+        self.client.force_authenticate(user=testing_reviewer)
+
+        response = self.client.post(
+            reverse("shop:create_review", kwargs={"pk": 1}),
+            data={"rate": 7},
+            format="json"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentReviewTests(TransactionTestCase):
+    """
+    Reviews posted at the same time from separate connections.
+    Needs row locks, so it only runs on databases that have them.
+    """
+    def post_reviews(self, item, posts):
+        barrier = threading.Barrier(len(posts))
+        errors = []
+
+        def post(user, rate):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            barrier.wait()
+
+            try:
+                response = client.post(
+                    reverse("shop:create_review", kwargs={"pk": item.id}),
+                    data={"rate": rate},
+                    format="json"
+                )
+                if response.status_code not in (status.HTTP_200_OK, status.HTTP_201_CREATED):
+                    errors.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post, args=p) for p in posts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+
+    def test_concurrent_reviews(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        reviewers = [
+            get_user_model().objects.create_user(
+                username=f"testing_reviewer{i}",
+                password="dws9uirj"
+            )
+            for i in range(4)
+        ]
+
+        # Every reviewer double-submits with different rates.
+        self.post_reviews(
+            item,
+            [(reviewer, rate) for reviewer in reviewers for rate in (2, 9)] * 3
+        )
+
+        item.refresh_from_db()
+        rates = list(models.ItemReview.objects.values_list("rate", flat=True))
+
+        self.assertEqual(len(rates), len(reviewers))
+        self.assertEqual(item.review_count, len(rates))
+        self.assertEqual(item.rating_sum, sum(rates))
+        self.assertEqual(item.rating_avg, sum(rates) / len(rates))
+
+
+class UpdateDestroyReviewTests(APITestCase):
+    def test_update_review(self):
+        testing_reviewer = get_user_model().objects.create_user(
+            username="testing_reviewer",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_reviewer,
+        )
+
+        review = models.ItemReview.objects.create(
+            rate=7,
+            text="This is a test review.",
+            item=item,
+            author=testing_reviewer
+        )
+
+        review_data = {
+            "rate": 5,
+            "text": "This is an updated review."
+        }
+
+        self.client.force_authenticate(user=testing_reviewer)
+
+        response = self.client.put(
+            reverse("shop:update_review", kwargs={"pk": item.id, "r_pk": review.id}),
+            data=review_data,
+            format="json"
+        )
+        
+        self.client.force_authenticate(user=None)
+        
+        review = models.ItemReview.objects.get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(review.rate, review_data["rate"])
+        self.assertEqual(review.text, review_data["text"])
+        self.assertEqual(review.author, testing_reviewer)
+        self.assertEqual(review.item, item)
+
+    def test_update_review_rating(self):
+        testing_reviewer = get_user_model().objects.create_user(
+            username="testing_reviewer",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_reviewer,
+        )
+
+        another_reviewer = get_user_model().objects.create_user(
+            username="another_reviewer",
+            password="dws9uirj"
+        )
+
+        for reviewer, rate in ((another_reviewer, 8), (testing_reviewer, 4)):
+            self.client.force_authenticate(user=reviewer)
+
+            response = self.client.post(
+                reverse("shop:create_review", kwargs={"pk": item.id}),
+                data={"rate": rate},
+                format="json"
+            )
+
+        response = self.client.put(
+            reverse("shop:update_review", kwargs={"pk": item.id, "r_pk": response.data["id"]}),
+            data={"rate": 9},
+            format="json"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        item.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(item.review_count, 2)
+        self.assertEqual(item.rating_sum, 17)
+        self.assertEqual(item.rating_avg, 8.5)
+
+    def test_delete_review(self):
+        testing_reviewer = get_user_model().objects.create_user(
+            username="testing_reviewer",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_reviewer,
+        )
+
+        review = models.ItemReview.objects.create(
+            rate=7,
+            text="This is a test review.",
+            item=item,
+            author=testing_reviewer
+        )
+
+        self.client.force_authenticate(user=testing_reviewer)
+
+        response = self.client.delete(
+            reverse("shop:update_review", kwargs={"pk": item.id, "r_pk": review.id}),
+            format="json"
+        )
+        
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(models.ItemReview.objects.count(), 0)
+
+    def test_delete_review_rating(self):
+        testing_reviewer = get_user_model().objects.create_user(
+            username="testing_reviewer",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_reviewer,
+        )
+
+        self.client.force_authenticate(user=testing_reviewer)
+
+        response = self.client.post(
+            reverse("shop:create_review", kwargs={"pk": item.id}),
+            data={"rate": 6},
+            format="json"
+        )
+
+        response = self.client.delete(
+            reverse("shop:update_review", kwargs={"pk": item.id, "r_pk": response.data["id"]}),
+            format="json"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        item.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(item.review_count, 0)
+        self.assertEqual(item.rating_sum, 0)
+        self.assertEqual(item.rating_avg, 0)
+
+    def test_update_review_not_author(self):
+        testing_reviewer = get_user_model().objects.create_user(
+            username="testing_reviewer",
+            password="dws9uirj"
+        )
+
+        another_user = get_user_model().objects.create_user(
+            username="another_user",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_reviewer,
+        )
+
+        review = models.ItemReview.objects.create(
+            rate=7,
+            text="This is a test review.",
+            item=item,
+            author=testing_reviewer
+        )
+
+        self.client.force_authenticate(user=another_user)
+
+        # item lock and review, in a savepoint that is rolled back
+        with self.assertNumQueries(5):
+            response = self.client.put(
+                reverse("shop:update_review", kwargs={"pk": item.id, "r_pk": review.id}),
+                data={"rate": 1},
+                format="json"
+            )
+
+        delete_response = self.client.delete(
+            reverse("shop:update_review", kwargs={"pk": item.id, "r_pk": review.id}),
+            format="json"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        review.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(delete_response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(review.rate, 7)
+
+    def test_update_review_other_item(self):
+        testing_reviewer = get_user_model().objects.create_user(
+            username="testing_reviewer",
+            password="dws9uirj"
+        )
+
+        item, another_item = (
+            models.Item.objects.create(
+                name=f"Test Item {i}",
+                description="This is a test item.",
+                price=Decimal("5.7"),
+                seller=testing_reviewer,
+            )
+            for i in range(2)
+        )
+
+        review = models.ItemReview.objects.create(
+            rate=7,
+            text="This is a test review.",
+            item=item,
+            author=testing_reviewer
+        )
+
+        self.client.force_authenticate(user=testing_reviewer)
+
+        response = self.client.put(
+            reverse("shop:update_review", kwargs={"pk": another_item.id, "r_pk": review.id}),
+            data={"rate": 1},
+            format="json"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ManageCartTests(APITestCase):
+    def test_cart_add_item(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        testing_buyer = get_user_model().objects.create_user(
+            username="testing_buyer",
+            password="dws9uirj"
+        )
+
+        models.Cart.objects.create(owner=testing_buyer)
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        self.client.force_authenticate(user=testing_buyer)
+
+        response = self.client.post(
+            reverse("shop:manage_cart", kwargs={"pk": item.id}),
+            format="json"
+        )
+        
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(item, testing_buyer.cart.items.all())
+
+    def test_cart_remove_item(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+        
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        testing_buyer = get_user_model().objects.create_user(
+            username="testing_buyer",
+            password="dws9uirj"
+        )
+
+        models.Cart.objects.create(owner=testing_buyer)
+        testing_buyer.cart.items.add(item, through_defaults={"price": item.price})
+
+        self.client.force_authenticate(user=testing_buyer)
+
+        response = self.client.delete(
+            reverse("shop:manage_cart", kwargs={"pk": item.id}),
+            format="json"
+        )
+        
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(testing_buyer.cart.items.count(), 0)
+        self.assertNotIn(item, testing_buyer.cart.items.all())
+
+    def test_cart_large(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        testing_buyer = get_user_model().objects.create_user(
+            username="testing_buyer",
+            password="dws9uirj"
+        )
+
+        cart = models.Cart.objects.create(owner=testing_buyer)
+
+        items = models.Item.objects.bulk_create(
+            models.Item(
+                name=f"Test Item {i}",
+                description="This is a test item.",
+                price=Decimal("5.7"),
+                seller=testing_seller,
+            ) for i in range(50)
+        )
+        cart.items.add(*items[1:], through_defaults={"price": Decimal("5.7")})
+
+        url = reverse("shop:manage_cart", kwargs={"pk": items[0].id})
+
+        self.client.force_authenticate(user=testing_buyer)
+
+        # cart, item, insert, cart timestamp
+        for _ in range(2):
+            with self.assertNumQueries(4):
+                response = self.client.post(url, format="json")
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(cart.items.count(), 50)
+
+        # cart, delete, cart timestamp
+        with self.assertNumQueries(3):
+            response = self.client.delete(url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # cart, delete, item
+        with self.assertNumQueries(3):
+            response = self.client.delete(url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.delete(
+            reverse("shop:manage_cart", kwargs={"pk": 0}),
+            format="json"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(cart.items.count(), 49)
+        self.assertNotIn(items[0], cart.items.all())
+
+    def test_cart_quantity(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=testing_seller,
+        )
+
+        testing_buyer = get_user_model().objects.create_user(
+            username="testing_buyer",
+            password="dws9uirj"
+        )
+
+        models.Cart.objects.create(owner=testing_buyer)
+
+        url = reverse("shop:manage_cart", kwargs={"pk": item.id})
+
+        self.client.force_authenticate(user=testing_buyer)
+
+        self.client.post(url, data={"quantity": 3}, format="json")
+        models.Item.objects.filter(pk=item.pk).update(price=Decimal("9.9"))
+        self.client.post(url, format="json")
+        response = self.client.post(url, data={"quantity": 0}, format="json")
+
+        self.client.force_authenticate(user=None)
+
+        line = models.CartLine.objects.get()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(line.quantity, 3)
+        self.assertEqual(line.price, Decimal("5.7"))
+
+
+class CheckoutTests(APITestCase):
+    def setUp(self):
+        self.testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        self.testing_buyer = get_user_model().objects.create_user(
+            username="testing_buyer",
+            password="dws9uirj"
+        )
+
+        self.cart = models.Cart.objects.create(owner=self.testing_buyer)
+
+        self.client.force_authenticate(user=self.testing_buyer)
+
+    def tearDown(self):
+        self.client.force_authenticate(user=None)
+
+    def create_items(self, count):
+        return models.Item.objects.bulk_create(
+            models.Item(
+                name=f"Test Item {i}",
+                description="This is a test item.",
+                price=Decimal("5.7") + i,
+                seller=self.testing_seller,
+            ) for i in range(count)
+        )
+
+    def checkout(self):
+        return self.client.post(reverse("shop:checkout"), format="json")
+
+    def test_checkout(self):
+        items = self.create_items(2)
+
+        for item, quantity in zip(items, (1, 3)):
+            self.client.post(
+                reverse("shop:manage_cart", kwargs={"pk": item.id}),
+                data={"quantity": quantity},
+                format="json"
+            )
+
+        response = self.checkout()
+
+        order = models.Order.objects.get()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["id"], order.id)
+        self.assertEqual(order.buyer, self.testing_buyer)
+        self.assertEqual(order.total, Decimal("5.7") + 3 * Decimal("6.7"))
+        self.assertEqual(
+            [(line["item"], line["name"], line["quantity"]) for line in response.data["lines"]],
+            [(items[0].id, "Test Item 0", 1), (items[1].id, "Test Item 1", 3)]
+        )
+        self.assertEqual(self.cart.lines.count(), 0)
+
+    def test_checkout_query_count(self):
+        items = self.create_items(30)
+
+        for count in (1, 30):
+            self.cart.items.set(items[:count], through_defaults={"price": Decimal("5.7")})
+
+            # savepoint, cart, cart lines, reservations, items, order,
+            # order lines, cart lines deletion, cart timestamp, release,
+            # order lines
+            with self.assertNumQueries(11):
+                response = self.checkout()
+
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(len(response.data["lines"]), count)
+
+    def test_checkout_empty_cart(self):
+        response = self.checkout()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(models.Order.objects.count(), 0)
+
+    def test_checkout_unavailable(self):
+        items = self.create_items(2)
+        self.cart.items.set(items, through_defaults={"price": Decimal("5.7")})
+        models.Item.objects.filter(pk=items[1].pk).update(stock=0)
+
+        response = self.checkout()
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["items"], [items[1].id])
+        self.assertEqual(models.Order.objects.count(), 0)
+        self.assertEqual(self.cart.lines.count(), 2)
+
+
+class ReserveItemTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        self.testing_buyer = get_user_model().objects.create_user(
+            username="testing_buyer",
+            password="dws9uirj"
+        )
+
+        self.item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            stock=3,
+            seller=testing_seller,
+        )
+
+        self.client.force_authenticate(user=self.testing_buyer)
+
+    def tearDown(self):
+        self.client.force_authenticate(user=None)
+
+    def reserve(self, quantity, pk=None):
+        return self.client.post(
+            reverse("shop:reserve_item", kwargs={"pk": pk or self.item.id}),
+            data={"quantity": quantity},
+            format="json"
+        )
+
+    def test_reserve_item(self):
+        response = self.reserve(2)
+
+        self.item.refresh_from_db()
+        reservation = models.StockReservation.objects.get()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["id"], reservation.id)
+        self.assertEqual(response.data["quantity"], 2)
+        self.assertEqual(reservation.user, self.testing_buyer)
+        self.assertEqual(self.item.stock, 1)
+        self.assertTrue(self.item.available)
+
+    def test_reserve_item_sold_out(self):
+        url = reverse("shop:retrieve_item", kwargs={"pk": self.item.id})
+
+        self.client.force_authenticate(user=None)
+        self.assertTrue(self.client.get(url, format="json").data["available"])
+        self.client.force_authenticate(user=self.testing_buyer)
+
+        response = self.reserve(3)
+
+        self.client.force_authenticate(user=None)
+        item_response = self.client.get(url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(item_response.data["available"])
+        self.assertNotIn("stock", item_response.data)
+
+    def test_seller_sees_stock(self):
+        url = reverse("shop:retrieve_item", kwargs={"pk": self.item.id})
+
+        response = self.client.get(url, format="json")
+
+        self.assertNotIn("stock", response.data)
+
+        self.client.force_authenticate(user=self.item.seller)
+
+        response = self.client.get(url, format="json")
+        list_response = self.client.get(reverse("shop:list_items"), format="json")
+
+        self.assertEqual(response.data["stock"], 3)
+        self.assertEqual(list_response.data["results"][0]["stock"], 3)
+
+        etag = response.headers["ETag"]
+        self.client.force_authenticate(user=self.testing_buyer)
+        self.reserve(1)
+        self.client.force_authenticate(user=self.item.seller)
+
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(testing_buyer.cart.items.count(), 0)
-        self.assertNotIn(item, testing_buyer.cart.items.all())
+        self.assertEqual(response.data["stock"], 2)
+
+    def test_reserve_item_not_enough(self):
+        response = self.reserve(4)
+
+        self.item.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["items"], [self.item.id])
+        self.assertEqual(self.item.stock, 3)
+        self.assertFalse(models.StockReservation.objects.exists())
+
+    def test_reserve_item_untracked(self):
+        models.Item.objects.filter(pk=self.item.pk).update(stock=None)
+
+        response = self.reserve(100)
+
+        self.item.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(self.item.stock)
+
+    def test_reserve_item_not_found(self):
+        response = self.reserve(1, pk=self.item.id + 1)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reserve_item_invalid_quantity(self):
+        response = self.reserve(0)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_checkout_reserved_items(self):
+        cart = models.Cart.objects.create(owner=self.testing_buyer)
+
+        # The reservation covers two of the items,
+        # the third one is taken from stock.
+        self.reserve(2)
+        cart.items.add(self.item, through_defaults={"price": self.item.price, "quantity": 3})
+
+        response = self.client.post(reverse("shop:checkout"), format="json")
+
+        self.item.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.item.stock, 0)
+        self.assertFalse(self.item.available)
+        self.assertFalse(models.StockReservation.objects.exists())
+
+
+@skipUnlessDBFeature("has_select_for_update")
+class ConcurrentReserveItemTests(TransactionTestCase):
+    """
+    Reservations of one item made at the same time
+    from separate connections.
+    """
+    def test_concurrent_reservations(self):
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            stock=5,
+            seller=testing_seller,
+        )
+
+        buyers = [
+            get_user_model().objects.create_user(
+                username=f"testing_buyer{i}",
+                password="dws9uirj"
+            )
+            for i in range(8)
+        ]
+
+        barrier = threading.Barrier(len(buyers))
+        codes = []
+
+        def reserve(user):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            barrier.wait()
+
+            try:
+                response = client.post(
+                    reverse("shop:reserve_item", kwargs={"pk": item.id}),
+                    data={"quantity": 1},
+                    format="json"
+                )
+                codes.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reserve, args=(buyer,)) for buyer in buyers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        item.refresh_from_db()
+
+        self.assertEqual(codes.count(status.HTTP_201_CREATED), 5)
+        self.assertEqual(codes.count(status.HTTP_409_CONFLICT), 3)
+        self.assertEqual(item.stock, 0)
+        self.assertEqual(models.StockReservation.objects.count(), 5)
+
+
+class CartTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        self.testing_buyer = get_user_model().objects.create_user(
+            username="testing_buyer",
+            password="dws9uirj"
+        )
+
+        self.items = models.Item.objects.bulk_create(
+            models.Item(
+                name=f"Test Item {i}",
+                description="This is a test item.",
+                price=Decimal("5.7") + i,
+                seller=testing_seller,
+            ) for i in range(3)
+        )
+
+        models.Cart.objects.create(owner=self.testing_buyer)
+
+        self.client.force_authenticate(user=self.testing_buyer)
+
+    def tearDown(self):
+        self.client.force_authenticate(user=None)
+
+    def add_to_cart(self, item, quantity):
+        return self.client.post(
+            reverse("shop:manage_cart", kwargs={"pk": item.id}),
+            data={"quantity": quantity},
+            format="json"
+        )
+
+    def test_cart_summary(self):
+        self.add_to_cart(self.items[0], 2)
+        self.add_to_cart(self.items[2], 1)
+
+        # cart lines, totals
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("shop:cart"), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(line["item"]["id"], line["quantity"]) for line in response.data["items"]],
+            [(self.items[0].id, 2), (self.items[2].id, 1)]
+        )
+        self.assertEqual(response.data["item_count"], 3)
+        self.assertEqual(response.data["subtotal"], "19.10")
+
+    def test_cart_summary_empty(self):
+        response = self.client.get(reverse("shop:cart"), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["items"], [])
+        self.assertEqual(response.data["item_count"], 0)
+        self.assertEqual(response.data["subtotal"], "0.00")
+
+    def test_cart_summary_cached(self):
+        self.add_to_cart(self.items[0], 2)
+        self.client.get(reverse("shop:cart"), format="json")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("shop:cart"), format="json")
+
+        self.assertEqual(response.data["item_count"], 2)
+
+        self.add_to_cart(self.items[1], 1)
+        response = self.client.get(reverse("shop:cart"), format="json")
+
+        self.assertEqual(response.data["item_count"], 3)
+
+        self.client.delete(reverse("shop:manage_cart", kwargs={"pk": self.items[0].id}))
+        response = self.client.get(reverse("shop:cart"), format="json")
+
+        self.assertEqual(response.data["item_count"], 1)
+        self.assertEqual(response.data["subtotal"], "6.70")
+
+    def test_cart_summary_item_renamed(self):
+        self.add_to_cart(self.items[0], 1)
+        self.client.get(reverse("shop:cart"), format="json")
+
+        self.items[0].name = "Renamed Test Item"
+        self.items[0].save()
+
+        response = self.client.get(reverse("shop:cart"), format="json")
+
+        self.assertEqual(response.data["items"][0]["item"]["name"], "Renamed Test Item")
+
+    def test_cart_summary_other_item_changed(self):
+        self.add_to_cart(self.items[0], 1)
+        self.client.get(reverse("shop:cart"), format="json")
+
+        self.items[1].name = "Renamed Test Item"
+        self.items[1].save()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("shop:cart"), format="json")
+
+        self.assertEqual(response.data["items"][0]["item"]["name"], self.items[0].name)
+
+        self.items[0].delete()
+
+        response = self.client.get(reverse("shop:cart"), format="json")
+
+        self.assertEqual(response.data["items"], [])
+
+    def test_cart_summary_not_authenticated(self):
+        self.client.force_authenticate(user=None)
+
+        response = self.client.get(reverse("shop:cart"), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def update_cart(self, operations):
+        return self.client.patch(
+            reverse("shop:cart"), data={"operations": operations}, format="json"
+        )
+
+    def test_update_cart(self):
+        self.add_to_cart(self.items[0], 2)
+        self.add_to_cart(self.items[1], 1)
+
+        # cart, items, savepoint, insert with quantities, insert
+        # without, delete, cart timestamp, release, totals, cart lines
+        with self.assertNumQueries(10):
+            response = self.update_cart([
+                {"action": "add", "item": self.items[0].id, "quantity": 5},
+                {"action": "remove", "item": self.items[1].id},
+                {"action": "add", "item": self.items[2].id},
+                {"action": "add", "item": self.items[2].id, "quantity": 7},
+                {"action": "remove", "item": self.items[2].id},
+                {"action": "add", "item": self.items[2].id},
+            ])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(line["item"]["id"], line["quantity"]) for line in response.data["items"]],
+            [(self.items[0].id, 5), (self.items[2].id, 1)]
+        )
+        self.assertEqual(response.data["item_count"], 6)
+        self.assertEqual(response.data["subtotal"], "36.20")
+
+    def test_update_cart_keeps_quantity(self):
+        self.add_to_cart(self.items[0], 2)
+
+        response = self.update_cart([{"action": "add", "item": self.items[0].id}])
+
+        self.assertEqual(response.data["item_count"], 2)
+
+    def test_update_cart_invalidates_summary(self):
+        self.client.get(reverse("shop:cart"), format="json")
+
+        self.update_cart([{"action": "add", "item": self.items[0].id, "quantity": 3}])
+
+        response = self.client.get(reverse("shop:cart"), format="json")
+
+        self.assertEqual(response.data["item_count"], 3)
+
+    def test_update_cart_unknown_item(self):
+        response = self.update_cart([
+            {"action": "add", "item": self.items[0].id},
+            {"action": "remove", "item": self.items[2].id + 1},
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["operations"][0], {})
+        self.assertIn("item", response.data["operations"][1])
+        self.assertFalse(models.CartLine.objects.exists())
+
+    def test_update_cart_invalid(self):
+        for operations in ([], [{"action": "move", "item": self.items[0].id}],
+                           [{"action": "add", "item": self.items[0].id, "quantity": 0}]):
+            response = self.update_cart(operations)
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ImportExportItemsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.testing_seller = get_user_model().objects.create_user(
+            username="testing_seller",
+            password="dws9uirj"
+        )
+
+        self.client.force_authenticate(user=self.testing_seller)
+
+    def tearDown(self):
+        self.client.force_authenticate(user=None)
+
+    def import_items(self, content, content_type):
+        return self.client.post(
+            reverse("shop:import_items"), data=content, content_type=content_type
+        )
+
+    def export_items(self, params=None):
+        response = self.client.get(reverse("shop:export_items"), params)
+
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_import_items_csv(self):
+        response = self.import_items(
+            "name,description,price,stock\n"
+            "Test Item 1,This is a test item.,5.7,\n"
+            "Test Item 2,\"This is a test item,\nover two lines.\",6.7,3\n"
+            "Test Item 3,This is a test item.,free,\n",
+            "text/csv; charset=utf-8"
+        )
+
+        items = models.Item.objects.order_by("pk")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["invalid"], 1)
+        self.assertEqual(response.data["errors"][0]["row"], 3)
+        self.assertIn("price", response.data["errors"][0]["errors"])
+        self.assertEqual(
+            [(item.name, item.price, item.stock, item.seller) for item in items],
+            [
+                ("Test Item 1", Decimal("5.7"), None, self.testing_seller),
+                ("Test Item 2", Decimal("6.7"), 3, self.testing_seller),
+            ]
+        )
+        self.assertEqual(items[1].description, "This is a test item,\nover two lines.")
+
+    def test_import_items_jsonl(self):
+        response = self.import_items(
+            '{"name": "Test Item 1", "description": "This is a test item.", "price": "5.7"}\n'
+            "\n"
+            '{"name": "Test Item 2"\n'
+            '["Test Item 3"]\n'
+            '{"name": "Test Item 4", "description": "This is a test item.", "price": 6.7, '
+            '"stock": 2, "available": false, "seller": 42}\n',
+            "application/x-ndjson"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3])
+        self.assertEqual(
+            list(models.Item.objects.order_by("pk").values_list("name", "stock", "seller")),
+            [
+                ("Test Item 1", None, self.testing_seller.id),
+                ("Test Item 4", 2, self.testing_seller.id)
+            ]
+        )
+
+    def test_import_items_batches(self):
+        rows = "".join(
+            f'{{"name": "Test Item {i}", "description": "This is a test item.", "price": "5.7"}}\n'
+            for i in range(25)
+        )
+
+        # 25 rows in batches of 10: savepoint, insert, release each
+        with self.assertNumQueries(9):
+            report = bulk.import_items(
+                rows.encode().splitlines(keepends=True),
+                bulk.JSONL,
+                self.testing_seller,
+                batch_size=10
+            )
+
+        self.assertEqual(report["created"], 25)
+        self.assertEqual(models.Item.objects.count(), 25)
+
+    def test_import_items_invalidates_catalogue(self):
+        self.client.force_authenticate(user=None)
+        self.client.get(reverse("shop:list_items"), format="json")
+        self.client.force_authenticate(user=self.testing_seller)
+
+        self.import_items(
+            "name,description,price\nTest Item,This is a test item.,5.7\n", "text/csv"
+        )
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse("shop:list_items"), format="json")
+
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_import_items_empty_body(self):
+        response = self.import_items("", "text/csv")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_items_unsupported_type(self):
+        response = self.import_items("<items/>", "application/xml")
+
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_import_items_not_authenticated(self):
+        self.client.force_authenticate(user=None)
+
+        response = self.import_items("name\n", "text/csv")
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_items(self):
+        another_seller = get_user_model().objects.create_user(
+            username="another_seller",
+            password="dws9uirj"
+        )
+
+        sellers = [(self.testing_seller, None), (self.testing_seller, 0), (another_seller, 1)]
+        for seller, stock in sellers:
+            models.Item.objects.create(
+                name="Test Item, \"quoted\"",
+                description="This is a test item.",
+                price=Decimal("5.7"),
+                stock=stock,
+                seller=seller,
+            )
+
+        response, content = self.export_items()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(len(content.splitlines()), 3)
+
+        models.Item.objects.all().delete()
+        report = self.import_items(content, "text/csv").data
+
+        self.assertEqual(report["created"], 2)
+        self.assertCountEqual(
+            models.Item.objects.values_list("name", "price", "stock", "available"),
+            [
+                ("Test Item, \"quoted\"", Decimal("5.7"), None, True),
+                ("Test Item, \"quoted\"", Decimal("5.7"), 0, False),
+            ]
+        )
+
+    def test_export_items_jsonl(self):
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=self.testing_seller,
+        )
+
+        response, content = self.export_items({"type": "jsonl"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/jsonl")
+        rows = [json.loads(line) for line in content.splitlines()]
+
+        self.assertEqual(parse_datetime(rows[0].pop("created_at")), item.created_at)
+        self.assertEqual(rows, [{
+            "id": item.id,
+            "name": "Test Item",
+            "description": "This is a test item.",
+            "price": "5.70",
+            "stock": None,
+            "available": True,
+        }])
+
+    async def test_export_items_async(self):
+        item = await models.Item.objects.acreate(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=self.testing_seller,
+        )
+        token = await sync_to_async(AccessToken.for_user)(self.testing_seller)
+
+        response = await self.async_client.get(
+            reverse("shop:export_items"),
+            {"type": "jsonl"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+
+        content = b"".join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(json.loads(content)["id"], item.id)
+
+    def test_export_items_unknown_type(self):
+        response = self.client.get(reverse("shop:export_items"), {"type": "xml"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
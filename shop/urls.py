@@ -7,8 +7,15 @@ app_name = "shop"
 
 urlpatterns = [
     path("", views.ListCreateItemView.as_view(), name="list_items"),
+    path("import/", views.ImportItemsView.as_view(), name="import_items"),
+    path("export/", views.ExportItemsView.as_view(), name="export_items"),
     path("item/<int:pk>/", views.RetrieveUpdateItemView.as_view(), name="retrieve_item"),
+    path("item/<int:pk>/photos/", views.UploadItemPhotosView.as_view(), name="upload_photos"),
+    path("item/<int:pk>/reviews/", views.ListReviewView.as_view(), name="list_reviews"),
     path("item/<int:pk>/review/", views.CreateReviewView.as_view(), name="create_review"),
     path("item/<int:pk>/review/<int:r_pk>/", views.UpdateDestroyReviewView.as_view(), name="update_review"),
+    path("item/<int:pk>/reserve/", views.ReserveItemView.as_view(), name="reserve_item"),
     path("item/<int:pk>/cart/", views.ManageCartView.as_view(), name="manage_cart"),
+    path("cart/", views.CartView.as_view(), name="cart"),
+    path("cart/checkout/", views.CheckoutView.as_view(), name="checkout"),
 ]
@@ -1,29 +1,104 @@
+from itertools import chain
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework import generics
 from rest_framework import permissions
-from django.http import Http404
+from rest_framework.exceptions import ParseError, UnsupportedMediaType, ValidationError
+from rest_framework.parsers import MultiPartParser
+from django.http import Http404, StreamingHttpResponse
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 
-from . import serializers, models
+from . import serializers, models, bulk, caching, carts, inventory, orders
+from .async_views import AsyncReadMixin
+from .conditional import ConditionalMixin, check_preconditions, make_etag, set_validators
+from .fieldsets import get_only_fields
+from .filters import ItemSearchFilter, ItemFilter, ItemOrderingFilter
+from .pagination import ItemCursorPagination, ReviewCursorPagination
 from .permissions import IsSellerOrReadOnly, IsReviewAuthor
 
 
-class ListCreateItemView(generics.ListCreateAPIView):
+class ItemQuerysetMixin:
+    """
+    Loads items with what the fields of ItemSerializer
+    chosen by the request need, see shop.fieldsets.
+    """
+    def get_queryset(self):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return models.Item.objects.with_details()
+
+        fields = self.get_serializer().fields
+
+        # Cursor pagination reads the ordering fields from the items.
+        return models.Item.objects.with_details(
+            seller="seller" in fields,
+            photos="photos" in fields,
+            reviews="recent_reviews" in fields,
+        ).only(*get_only_fields(
+            fields,
+            "seller",
+            *getattr(self, "ordering_fields", []),
+            related=["seller"]
+        ))
+
+
+class ListCreateItemView(AsyncReadMixin, ItemQuerysetMixin, generics.ListCreateAPIView):
     """
     This view is used to get a list
     of items, or create a new item.
+    Items can be searched with the "q" query parameter,
+    filtered with "price_min", "price_max", "available"
+    and "seller", and sorted with "ordering".
     """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
-    queryset = models.Item.objects.all().order_by("-created_at")
     serializer_class = serializers.ItemSerializer
+    pagination_class = ItemCursorPagination
+    filter_backends = [ItemSearchFilter, ItemFilter, ItemOrderingFilter]
+    ordering_fields = ["price", "created_at", "rating_avg"]
+    ordering = "-created_at"
+
+    async def aget(self, request, *args, **kwargs):
+        # Sellers see the stock of their items, which changes
+        # without a new catalogue version, so authenticated
+        # lists are neither cached nor validated.
+        if request.user.is_authenticated:
+            return Response(await self.alist_data(request))
+
+        validators = await caching.aget_catalogue_validators()
+
+        response = check_preconditions(request, *validators)
+        if response is None:
+            response = await self.aget_list_response(request)
+
+        return set_validators(response, *validators)
+
+    async def aget_list_response(self, request):
+        key = await caching.aget_list_key(request)
+        data = await cache.aget(key)
+
+        if data is None:
+            await caching.apin_primary_for_fill()
+            data = await self.alist_data(request)
+            await cache.aset(key, data)
+
+        return Response(data)
+
+    async def alist_data(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+
+        return self.get_paginated_response(self.get_serializer(page, many=True).data).data
 
     def perform_create(self, serializer):
         serializer.save(seller=self.request.user)
 
 
-class RetrieveUpdateItemView(generics.RetrieveUpdateDestroyAPIView):
+class RetrieveUpdateItemView(AsyncReadMixin, ConditionalMixin, ItemQuerysetMixin,
+                             generics.RetrieveUpdateDestroyAPIView):
     """
     This view is used to retrieve information
     about an item, update, or delete it.
@@ -32,26 +107,216 @@ class RetrieveUpdateItemView(generics.RetrieveUpdateDestroyAPIView):
         permissions.IsAuthenticatedOrReadOnly,
         IsSellerOrReadOnly
     ]
-    queryset = models.Item.objects.all()
     serializer_class = serializers.ItemSerializer
 
+    def get_validators(self):
+        return self.make_validators(*get_object_or_404(
+            models.Item.objects.values_list("updated_at", "seller_id", "stock"),
+            pk=self.kwargs["pk"]
+        ))
+
+    async def aget_validators(self):
+        row = await models.Item.objects.filter(
+            pk=self.kwargs["pk"]
+        ).values_list("updated_at", "seller_id", "stock").afirst()
+
+        if row is None:
+            raise Http404
+
+        return self.make_validators(*row)
+
+    def make_validators(self, updated_at, seller_id, stock):
+        # The seller's representation includes the stock, which
+        # changes without updating the item's timestamp.
+        if seller_id == self.request.user.pk:
+            return make_etag("item", self.kwargs["pk"], updated_at.isoformat(), stock), None
+
+        return make_etag("item", self.kwargs["pk"], updated_at.isoformat()), updated_at
+
+    async def aget(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return await self.aretrieve(request)
+
+        key = await caching.aget_item_key(request, kwargs["pk"])
+        cached = await cache.aget(key)
+
+        if cached is None:
+            await caching.apin_primary_for_fill()
+            response = await self.aretrieve(request)
+
+            if response.status_code == status.HTTP_200_OK:
+                await cache.aset(key, (response.data, *self.validators))
+
+            return response
+
+        data, *validators = cached
+
+        response = check_preconditions(request, *validators) or Response(data)
+
+        return set_validators(response, *validators)
+
+    async def aretrieve(self, request):
+        self.validators = await self.aget_validators()
+
+        response = check_preconditions(request, *self.validators)
+        if response is None:
+            try:
+                instance = await self.get_queryset().aget(pk=self.kwargs["pk"])
+            except models.Item.DoesNotExist:
+                raise Http404
+
+            self.check_object_permissions(request, instance)
+            response = Response(self.get_serializer(instance).data)
+
+        return set_validators(response, *self.validators)
+
+
+class ImportItemsView(APIView):
+    """
+    This view is used to create many items at once
+    from a CSV or JSON Lines file sent as the request
+    body, which is read as it arrives.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        media_type = request.content_type.split(";")[0].strip()
+        format = bulk.get_format(media_type)
+        if format is None:
+            raise UnsupportedMediaType(media_type)
+
+        # The body isn't parsed, the request is iterated line by line.
+        # DRF has no stream for bodies without a Content-Length, like
+        # chunked uploads, so the Django request is read instead.
+        lines = iter(request._request)
+        first_line = next(lines, None)
+        if first_line is None:
+            raise ParseError("The request body is empty.")
+
+        report = bulk.import_items(chain([first_line], lines), format, request.user)
+
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class ExportItemsView(APIView):
+    """
+    This view is used to download user's items as CSV,
+    or as JSON Lines with "?type=jsonl".
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        format = request.query_params.get("type", bulk.CSV)
+        if format not in bulk.MEDIA_TYPES:
+            raise ValidationError({"type": [f"Choose one of: {', '.join(bulk.MEDIA_TYPES)}."]})
+
+        # Each server streams its own kind of iterator without buffering.
+        export_items = (
+            bulk.aexport_items if isinstance(request._request, ASGIRequest) else bulk.export_items
+        )
+
+        response = StreamingHttpResponse(
+            export_items(models.Item.objects.filter(seller=request.user), format),
+            content_type=bulk.MEDIA_TYPES[format][0]
+        )
+        response["Content-Disposition"] = f'attachment; filename="items.{format}"'
+
+        return response
+
+
+class UploadItemPhotosView(generics.GenericAPIView):
+    """
+    This view is used to upload several
+    photos of an item at once.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsSellerOrReadOnly]
+    queryset = models.Item.objects.all()
+    serializer_class = serializers.ItemPhotoUploadSerializer
+    parser_classes = [MultiPartParser]
+
+    def initialize_request(self, request, *args, **kwargs):
+        # Stream the files to disk instead of holding them in memory.
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
+    def post(self, request, pk):
+        item = self.get_object()
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        photos = serializer.save(item=item)
+
+        return Response(
+            serializers.ItemPhotoSerializer(
+                photos,
+                many=True,
+                context=self.get_serializer_context()
+            ).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class ListReviewView(AsyncReadMixin, generics.ListAPIView):
+    """
+    This view is used to get a list
+    of reviews of an item.
+    """
+    serializer_class = serializers.ItemReviewSerializer
+    pagination_class = ReviewCursorPagination
+
+    def get_queryset(self):
+        fields = self.get_serializer().fields
+
+        # Cursor pagination reads the creation time from the reviews.
+        return models.ItemReview.objects.filter(
+            item_id=self.kwargs["pk"]
+        ).select_related(
+            *(name for name in ("item", "author") if name in fields)
+        ).only(*get_only_fields(
+            fields,
+            "item",
+            "author",
+            "created_at",
+            related=["item", "author"]
+        ))
+
+    async def aget(self, request, *args, **kwargs):
+        if not await models.Item.objects.filter(pk=kwargs["pk"]).aexists():
+            raise Http404
+
+        page = await self.paginator.apaginate_queryset(
+            self.filter_queryset(self.get_queryset()), request, view=self
+        )
+
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
 
 class CreateReviewView(APIView):
     """
     This view is used to leave review on an item.
+    Users have one review per item, so posting
+    again updates the existing review.
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
-        item = get_object_or_404(models.Item, pk=pk)
-
         serializer = serializers.ItemReviewSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save(author=request.user, item=item)
 
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        with transaction.atomic():
+            # The lock serializes reviews of the item.
+            item = get_object_or_404(models.Item.objects.select_for_update(), pk=pk)
+
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            review, created = models.ItemReview.objects.create_or_update(
+                item, request.user, **serializer.validated_data
+            )
+
+        return Response(
+            serializers.ItemReviewSerializer(review).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
 
 
 class UpdateDestroyReviewView(APIView):
@@ -60,43 +325,167 @@ class UpdateDestroyReviewView(APIView):
     """
     permission_classes = [permissions.IsAuthenticated, IsReviewAuthor]
 
+    def get_review(self, pk, r_pk):
+        """
+        Lock the item like CreateReviewView does, so the rating
+        deltas are computed from the current rate, then fetch
+        the review and check that the user is its author.
+        """
+        get_object_or_404(models.Item.objects.select_for_update().only("pk"), pk=pk)
+
+        review = get_object_or_404(
+            models.ItemReview.objects.select_related("item", "author"),
+            pk=r_pk,
+            item_id=pk
+        )
+        self.check_object_permissions(self.request, review)
+
+        return review
+
     def put(self, request, pk, r_pk):
-        review = get_object_or_404(models.ItemReview, pk=r_pk)
+        with transaction.atomic():
+            review = self.get_review(pk, r_pk)
+            old_rate = review.rate
 
-        serializer = serializers.ItemReviewSerializer(review, data=request.data)
-        if serializer.is_valid():
-            serializer.save()
+            serializer = serializers.ItemReviewSerializer(review, data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            review = serializer.save()
+            models.Item.objects.filter(pk=pk).update_rating(0, review.rate - old_rate)
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
     def delete(self, request, pk, r_pk):
-        review = get_object_or_404(models.ItemReview, pk=r_pk)
-        review.delete()
+        with transaction.atomic():
+            # The item's review aggregates are updated by a signal.
+            self.get_review(pk, r_pk).delete()
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class ReserveItemView(APIView):
+    """
+    This view is used to reserve items,
+    which holds them for a while for the user.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        serializer = serializers.StockReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        reservation = inventory.reserve(pk, request.user, serializer.validated_data["quantity"])
+
+        return Response(
+            serializers.StockReservationSerializer(reservation).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class CartView(APIView):
+    """
+    This view is used to get the contents of user's
+    cart, with the number of items and their total price,
+    or to add and remove several items at once.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_summary(self):
+        lines = models.CartLine.objects.filter(cart__owner=self.request.user)
+
+        return serializers.CartSummarySerializer({
+            "items": lines.select_related("item").only(
+                "item__id", "item__name", "quantity", "price"
+            ).order_by("pk"),
+            **lines.totals(),
+        }).data
+
+    def get(self, request):
+        key = caching.get_cart_key(request.user.pk)
+        data = cache.get(key)
+
+        if data is None:
+            caching.pin_primary_for_fill()
+            data = self.get_summary()
+            cache.set(key, data)
+
+        return Response(data)
+
+    def patch(self, request):
+        cart = get_object_or_404(
+            models.Cart.objects.only("pk", "owner"), owner=request.user
+        )
+
+        serializer = serializers.CartUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            carts.apply(cart, serializer.validated_data["operations"])
+
+        return Response(self.get_summary(), status=status.HTTP_200_OK)
+
+
 class ManageCartView(APIView):
     """
     This view is used to add or delete an item
-    from user's cart.
+    from user's cart, or set its quantity.
     """
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_cart(self):
+        return get_object_or_404(
+            models.Cart.objects.only("pk", "owner"), owner=self.request.user
+        )
+
     def post(self, request, pk):
-        item = get_object_or_404(models.Item, pk=pk)
+        cart = self.get_cart()
 
-        if item not in request.user.cart.items.all():
-            request.user.cart.items.add(item)
+        serializer = serializers.CartLineSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        price = models.Item.objects.filter(pk=pk).values_list("price", flat=True).first()
+        if price is None:
+            raise Http404
+
+        # Adding the item again sets the quantity, if one is given.
+        data = serializer.validated_data
+        line = models.CartLine(cart_id=cart.pk, item_id=pk, price=price, **data)
+        carts.add_lines([line], set_quantity="quantity" in data)
+        carts.touch(cart)
 
         return Response(status=status.HTTP_200_OK)
 
     def delete(self, request, pk):
-        item = get_object_or_404(models.Item, pk=pk)
+        cart = self.get_cart()
+
+        deleted, _ = models.CartLine.objects.filter(
+            cart_id=cart.pk, item_id=pk
+        ).delete()
 
-        if item in request.user.cart.items.all():
-            request.user.cart.items.remove(item)
+        if deleted:
+            carts.touch(cart)
+        elif not models.Item.objects.filter(pk=pk).exists():
+            raise Http404
 
         return Response(status=status.HTTP_200_OK)
+
+
+class CheckoutView(APIView):
+    """
+    This view is used to turn user's cart into an order.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        with transaction.atomic():
+            cart = get_object_or_404(
+                models.Cart.objects.select_for_update().only("pk", "owner"),
+                owner=request.user
+            )
+            order = orders.checkout(cart)
+
+        return Response(
+            serializers.OrderSerializer(order).data,
+            status=status.HTTP_201_CREATED
+        )
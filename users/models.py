@@ -8,8 +8,11 @@ class CustomUser(AbstractUser):
     Custom user model.
     """
     profile_pic = models.ImageField(upload_to="profile_pic/", blank=True, null=True)
+    # Resized copies of the picture, see shop.images.
+    profile_pic_variants = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField(blank=True, null=True)
     country = CountryField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.username
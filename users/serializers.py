@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from django_countries.serializers import CountryFieldMixin
-from shop.serializers import CompactItemSerializer, ItemReviewSerializer, CartSerializer
+from shop.serializers import (CompactItemSerializer, ItemReviewSerializer,
+                              CartSerializer, VariantImageField)
+from shop.fieldsets import SparseFieldsetMixin
 
 
 class CreateUserSerializer(serializers.ModelSerializer):
@@ -20,7 +22,25 @@ class CreateUserSerializer(serializers.ModelSerializer):
 
         return user
 
-class UserSerializer(CountryFieldMixin, serializers.ModelSerializer):
+
+class UserListSerializer(SparseFieldsetMixin, CountryFieldMixin,
+                         serializers.ModelSerializer):
+    """
+    Compact user serializer used for user lists.
+    It doesn't embed any related objects.
+    """
+    profile_pic = VariantImageField(
+        variants_field="profile_pic_variants",
+        read_only=True
+    )
+
+    class Meta:
+        model = get_user_model()
+        fields = ["id", "username", "first_name", "last_name",
+                  "profile_pic", "country"]
+
+
+class UserSerializer(SparseFieldsetMixin, CountryFieldMixin, serializers.ModelSerializer):
     """
     User serializer.
     Can be used to retrieve or update user data.
@@ -28,6 +48,11 @@ class UserSerializer(CountryFieldMixin, serializers.ModelSerializer):
     items = CompactItemSerializer(read_only=True, many=True)
     reviewed = ItemReviewSerializer(read_only=True, many=True)
     cart = CartSerializer(read_only=True)
+    profile_pic = VariantImageField(
+        variants_field="profile_pic_variants",
+        required=False,
+        allow_null=True
+    )
 
     class Meta:
         model = get_user_model()
@@ -1,8 +1,11 @@
+from decimal import Decimal
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
 from rest_framework import status
 
+from shop import models
+
 
 class ListCreateUserViewTests(APITestCase):
     def test_get_user_list(self):
@@ -24,7 +27,58 @@ class ListCreateUserViewTests(APITestCase):
         response = self.client.get(reverse("users:list_create"), format="json")
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertNotIn("reviewed", response.data["results"][0])
+
+    def test_get_user_list_query_count(self):
+        for i in range(15):
+            get_user_model().objects.create_user(
+                username=f"test_user{i}",
+                password="dws9uirj"
+            )
+
+        # count, users
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("users:list_create"), format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 15)
+        self.assertEqual(len(response.data["results"]), 10)
+
+    def test_user_list_not_modified(self):
+        user = get_user_model().objects.create_user(
+            username="test_user",
+            password="dws9uirj"
+        )
+
+        url = reverse("users:list_create")
+        response = self.client.get(url, format="json")
+
+        self.assertIn("Last-Modified", response.headers)
+
+        etag = response.headers["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        user.first_name = "Test"
+        user.save()
+
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+        etag = response.headers["ETag"]
+        user.delete()
+
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 0)
 
     def test_create_user(self):
         data = {
@@ -39,8 +93,10 @@ class ListCreateUserViewTests(APITestCase):
         )
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(response.data)
         self.assertEqual(get_user_model().objects.count(), 1)
         self.assertEqual(get_user_model().objects.get().username, data["username"])
+        self.assertTrue(models.Cart.objects.filter(owner__username=data["username"]).exists())
 
 
 class UserDetailViewTest(APITestCase):
@@ -58,6 +114,144 @@ class UserDetailViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["username"], user.username)
 
+    def test_retrieve_user_query_count(self):
+        user = get_user_model().objects.create_user(
+            username="test_user",
+            password="dws9uirj"
+        )
+
+        cart = models.Cart.objects.create(owner=user)
+
+        for i in range(3):
+            item = models.Item.objects.create(
+                name=f"Test Item {i}",
+                description="This is a test item.",
+                price=Decimal("5.7"),
+                seller=user,
+            )
+
+            models.ItemReview.objects.create(
+                rate=7,
+                text="This is a test review.",
+                item=item,
+                author=user
+            )
+
+            cart.items.add(item, through_defaults={"price": item.price})
+
+        # validators, user with cart, items, reviews, cart items
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                reverse("users:detail", kwargs={"pk": user.id}),
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["items"]), 3)
+        self.assertEqual(len(response.data["reviewed"]), 3)
+        self.assertEqual(len(response.data["cart"]["items"]), 3)
+
+    def test_retrieve_user_sparse_fieldset(self):
+        user = get_user_model().objects.create_user(
+            username="test_user",
+            password="dws9uirj"
+        )
+
+        cart = models.Cart.objects.create(owner=user)
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=user,
+        )
+
+        cart.items.add(item, through_defaults={"price": item.price})
+
+        # validators, user with cart, cart items
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse("users:detail", kwargs={"pk": user.id}),
+                data={"fields": "id,username", "expand": "cart"},
+                format="json"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), ["id", "username", "cart"])
+        self.assertEqual(response.data["cart"]["owner"]["username"], user.username)
+        self.assertEqual(len(response.data["cart"]["items"]), 1)
+
+    def test_user_not_modified(self):
+        user = get_user_model().objects.create_user(
+            username="test_user",
+            password="dws9uirj"
+        )
+
+        cart = models.Cart.objects.create(owner=user)
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=user,
+        )
+
+        url = reverse("users:detail", kwargs={"pk": user.id})
+
+        response = self.client.get(url, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Last-Modified", response.headers)
+
+        etag = response.headers["ETag"]
+
+        # validators only
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        cart.items.add(item, through_defaults={"price": item.price})
+
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+        etag = response.headers["ETag"]
+
+        item.name = "Renamed Test Item"
+        item.save()
+
+        response = self.client.get(url, format="json", HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["items"][0]["name"], item.name)
+
+    def test_update_user_if_match(self):
+        user = get_user_model().objects.create_user(
+            username="test_user",
+            password="dws9uirj"
+        )
+
+        url = reverse("users:detail", kwargs={"pk": user.id})
+
+        self.client.force_authenticate(user=user)
+
+        response = self.client.patch(
+            url,
+            data={"bio": "Test bio."},
+            format="json",
+            HTTP_IF_MATCH='"outdated"'
+        )
+
+        self.client.force_authenticate(user=None)
+
+        user.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertIsNone(user.bio)
+
     def test_forbidden_access(self):
         user1 = get_user_model().objects.create_user(
             username="test_user1",
@@ -128,7 +322,6 @@ class UserDetailViewTest(APITestCase):
         self.assertEqual(user.bio, data["bio"])
         self.assertEqual(user.country.code, data["country"])
 
-
     def test_delete_user(self):
         user = get_user_model().objects.create_user(
             username="test_user",
@@ -145,3 +338,39 @@ class UserDetailViewTest(APITestCase):
         self.client.force_authenticate(user=None)
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_delete_reviewer(self):
+        seller = get_user_model().objects.create_user(
+            username="test_seller",
+            password="dws9uirj"
+        )
+        reviewer = get_user_model().objects.create_user(
+            username="test_reviewer",
+            password="dws9uirj"
+        )
+
+        item = models.Item.objects.create(
+            name="Test Item",
+            description="This is a test item.",
+            price=Decimal("5.7"),
+            seller=seller,
+        )
+        models.ItemReview.objects.create_or_update(item, seller, rate=4)
+        models.ItemReview.objects.create_or_update(item, reviewer, rate=8)
+
+        self.client.force_authenticate(user=reviewer)
+
+        response = self.client.delete(
+            reverse("users:detail", kwargs={"pk": reviewer.id}),
+            format="json"
+        )
+
+        self.client.force_authenticate(user=None)
+
+        item.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            (item.review_count, item.rating_sum, item.rating_avg),
+            (1, 4, 4.0)
+        )
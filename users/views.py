@@ -1,44 +1,130 @@
-from rest_framework.views import APIView
-from rest_framework.generics import RetrieveUpdateDestroyAPIView
+from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework import permissions, status
 from rest_framework.response import Response
-from rest_framework import status, permissions
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.shortcuts import get_object_or_404
 
 from . import serializers
 from .permissions import IsCurrentUserOrReadOnly
-from shop.models import Cart
+from shop import caching
+from shop.conditional import ConditionalMixin, check_preconditions, make_etag, set_validators
+from shop.fieldsets import get_only_fields
+from shop.models import Cart, CartLine, Item, ItemReview
 
 
-class ListCreateUserView(APIView):
+class ListCreateUserView(ListCreateAPIView):
     """
-    This view returns a list of users on GET
-    request, and creates a new user on POST.
+    This view returns a paginated list of users
+    on GET request, and creates a new user on POST.
     """
-    def get(self, request):
-        users = get_user_model().objects.all()
+    queryset = get_user_model().objects.order_by("id")
 
-        serializer = serializers.UserSerializer(users, many=True)
+    def get_serializer_class(self):
+        if self.request.method == "POST":
+            return serializers.CreateUserSerializer
 
-        return Response(data=serializer.data)
+        return serializers.UserListSerializer
 
-    def post(self, request):
-        serializer = serializers.CreateUserSerializer(data=request.data)
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in permissions.SAFE_METHODS:
+            return queryset
 
-        if serializer.is_valid():
+        return queryset.only(*get_only_fields(self.get_serializer().fields))
+
+    def list(self, request, *args, **kwargs):
+        validators = caching.get_users_validators()
+
+        response = check_preconditions(request, *validators)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+
+        return set_validators(response, *validators)
+
+    def create(self, request, *args, **kwargs):
+        # Keep the empty 201 body POST /u/ has always returned.
+        super().create(request, *args, **kwargs)
+
+        return Response(status=status.HTTP_201_CREATED)
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
             user = serializer.save()
             Cart.objects.create(owner=user)
 
-            return Response(status=status.HTTP_201_CREATED)
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+def _latest_update(items):
+    return Subquery(items.order_by("-updated_at").values("updated_at")[:1])
 
 
-class UserDetailView(RetrieveUpdateDestroyAPIView):
+class UserDetailView(ConditionalMixin, RetrieveUpdateDestroyAPIView):
     """
     This view retrieves information about a user.
     It also allows authenticated users to update
     or delete their profile.
     """
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsCurrentUserOrReadOnly]
-    queryset = get_user_model().objects.all()
+    queryset = get_user_model().objects.select_related("cart").prefetch_related(
+        "items",
+        Prefetch(
+            "reviewed",
+            queryset=ItemReview.objects.select_related("item", "author")
+        ),
+        Prefetch("cart__lines", queryset=CartLine.objects.select_related("item")),
+    )
     serializer_class = serializers.UserSerializer
+
+    def get_queryset(self):
+        if self.request.method not in permissions.SAFE_METHODS:
+            return super().get_queryset()
+
+        # Only load the relations the request asked for.
+        fields = self.get_serializer().fields
+        queryset = get_user_model().objects.only(*get_only_fields(fields, related=["cart"]))
+
+        if "items" in fields:
+            queryset = queryset.prefetch_related("items")
+        if "reviewed" in fields:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "reviewed",
+                    queryset=ItemReview.objects.select_related("item", "author")
+                )
+            )
+        if "cart" in fields:
+            queryset = queryset.select_related("cart").prefetch_related(
+                Prefetch("cart__lines", queryset=CartLine.objects.select_related("item"))
+            )
+
+        return queryset
+
+    def get_validators(self):
+        # The representation embeds the user's items, reviewed items
+        # and cart, so it changes whenever any of them does.
+        timestamps = get_object_or_404(
+            get_user_model().objects.annotate(
+                items_updated_at=_latest_update(
+                    Item.objects.filter(seller=OuterRef("pk"))
+                ),
+                reviewed_updated_at=_latest_update(
+                    Item.objects.filter(reviews__author=OuterRef("pk"))
+                ),
+                cart_items_updated_at=_latest_update(
+                    Item.objects.filter(cart__owner=OuterRef("pk"))
+                ),
+            ).values_list(
+                "updated_at",
+                "items_updated_at",
+                "reviewed_updated_at",
+                "cart__updated_at",
+                "cart_items_updated_at"
+            ),
+            pk=self.kwargs["pk"]
+        )
+
+        return (
+            make_etag("user", self.kwargs["pk"], *timestamps),
+            max(timestamp for timestamp in timestamps if timestamp)
+        )